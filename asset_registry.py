@@ -0,0 +1,165 @@
+from collections import OrderedDict
+import pygame, config, geometry
+
+class NullSound:
+    """Stand-in for pygame.mixer.Sound in headless mode"""
+
+    def play(self, loops: int = 0, maxtime: int = 0, fade_ms: int = 0):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value: float):
+        pass
+
+    def get_volume(self) -> float:
+        return 0.0
+
+
+class AssetRegistry:
+    """Loads every texture and sound file once and shares it between entities.
+
+    Derived surfaces (scaled, rotated, wall size + orientation) are cached in a
+    bounded LRU so chunks with many walls don't keep one texture copy per wall.
+    Sprites drawn at any angle go through the rotation atlas instead, which
+    holds one frame per ROTATION_STEP degrees, built the first time it's used.
+    In headless mode no file is touched: images are None and sounds are
+    NullSound instances.
+    """
+
+    def __init__(self, max_variants: int = config.ASSET_VARIANT_CACHE_SIZE):
+        self.max_variants = max_variants
+        self._images: dict[tuple[str, bool], pygame.Surface | None] = {}
+        self._sounds: dict[str, pygame.mixer.Sound | NullSound] = {}
+        self._variants: OrderedDict[tuple, pygame.Surface | None] = OrderedDict()
+        self._rotations: dict[tuple, list[tuple[pygame.Surface | None, tuple[float, float]] | None]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_image(self, path: str, alpha: bool = True) -> pygame.Surface | None:
+        key = (path, alpha)
+        if key in self._images:
+            self.hits += 1
+            return self._images[key]
+
+        self.misses += 1
+        if config.HEADLESS:
+            self._images[key] = None
+            return None
+
+        try:
+            surface = pygame.image.load(path)
+            # Converting needs a display mode, skip it until one is set
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if alpha else surface.convert()
+        except pygame.error:
+            print(f"Could not load texture {path}")
+            surface = None
+
+        self._images[key] = surface
+        return surface
+
+    def get_scaled(self, path: str, size: tuple[int, int], alpha: bool = True) -> pygame.Surface | None:
+        key = ('scaled', path, alpha, size)
+        return self._get_variant(key, lambda: self._scale(self.get_image(path, alpha), size))
+
+    def get_rotated(self, path: str, size: tuple[int, int], angle: float, alpha: bool = True) -> pygame.Surface | None:
+        key = ('rotated', path, alpha, size, angle)
+        return self._get_variant(key, lambda: self._rotate(self.get_scaled(path, size, alpha), angle))
+
+    def get_rotation_frame(self, path: str, size: tuple[int, int], angle: float, pivot: tuple[float, float] = (0, 0),
+                           alpha: bool = True) -> tuple[pygame.Surface | None, tuple[float, float]]:
+        """Sprite rotated to the nearest ROTATION_STEP and where to blit it.
+
+        The pivot is a point of the sprite relative to its center, the one
+        that ends up at the drawn position. Returns the rotated surface and
+        the offset of its top-left corner from the drawn position.
+        """
+        key = (path, size, pivot, alpha)
+        frames = self._rotations.get(key)
+        if frames is None:
+            frames = self._rotations[key] = [None] * round(360 / config.ROTATION_STEP)
+
+        index = round(angle / config.ROTATION_STEP) % len(frames)
+        frame = frames[index]
+        if frame is not None:
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        quantized_angle = index * config.ROTATION_STEP
+        surface = self._rotate(self.get_scaled(path, size, alpha), quantized_angle)
+        rotated_x, rotated_y = geometry.rotate_point(*pivot, quantized_angle)
+        width, height = surface.get_size() if surface else size
+        frame = frames[index] = (surface, (-rotated_x - width / 2, -rotated_y - height / 2))
+        return frame
+
+    def get_wall_texture(self, width: int, height: int, orientation: str) -> pygame.Surface | None:
+        key = ('wall', width, height, orientation)
+
+        def build():
+            # Vertical walls reuse the horizontal texture rotated by 90 degrees
+            size = (width, height) if orientation == 'horizontal' else (height, width)
+            texture = self._scale(self.get_image(config.WALL_TEXTURE, alpha=False), size)
+            if orientation == 'vertical':
+                texture = self._rotate(texture, 90)
+            return texture
+
+        return self._get_variant(key, build)
+
+    def get_sound(self, path: str) -> pygame.mixer.Sound | NullSound:
+        if path in self._sounds:
+            self.hits += 1
+            return self._sounds[path]
+
+        self.misses += 1
+        sound = NullSound() if config.HEADLESS else pygame.mixer.Sound(path)
+        self._sounds[path] = sound
+        return sound
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'images': len(self._images),
+            'sounds': len(self._sounds),
+            'variants': len(self._variants),
+            'rotation_frames': sum(frame is not None for frames in self._rotations.values() for frame in frames),
+        }
+
+    def clear(self):
+        self._images.clear()
+        self._sounds.clear()
+        self._variants.clear()
+        self._rotations.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_variant(self, key: tuple, build) -> pygame.Surface | None:
+        if key in self._variants:
+            self.hits += 1
+            self._variants.move_to_end(key)
+            return self._variants[key]
+
+        self.misses += 1
+        surface = build()
+        self._variants[key] = surface
+        if len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
+        return surface
+
+    @staticmethod
+    def _scale(surface: pygame.Surface | None, size: tuple[int, int]) -> pygame.Surface | None:
+        if surface is None:
+            return None
+        return pygame.transform.scale(surface, size)
+
+    @staticmethod
+    def _rotate(surface: pygame.Surface | None, angle: float) -> pygame.Surface | None:
+        if surface is None:
+            return None
+        return pygame.transform.rotate(surface, angle)
+
+
+assets = AssetRegistry()
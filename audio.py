@@ -0,0 +1,120 @@
+import math
+import pygame, config
+from asset_registry import assets
+
+LOOP_CHANNEL = 0  # Reserved for the torch loop, sound effects never take it
+
+SOUNDS: tuple[str, ...] = (
+    config.TORCH_SOUND,
+    config.GAME_OVER_SOUND,
+    config.BULLET_SOUND,
+    config.PLAYER_HURT_SOUND,
+    config.PLAYER_BULLET_RECHARGE_SOUND,
+    config.ENEMY_HURT_SOUND,
+    config.BONUS_PICKUP_SOUND,
+)
+
+
+class AudioService:
+    """Plays every sound of the game through a fixed set of mixer channels.
+
+    Sounds come decoded once from the asset registry. Sounds with a world
+    position are attenuated and panned by their distance from the player
+    and dropped before taking a channel when they would be inaudible. Each
+    sound plays at most AUDIO_MAX_VOICES_PER_SOUND times at once and all of
+    them share AUDIO_CHANNELS channels, except the loop channel which is
+    reserved for the torch.
+    """
+
+    def __init__(self, world):
+        self._world = world
+        self._ready = False
+        self._channels: list[pygame.mixer.Channel] = []  # Effect channels, the loop channel excluded
+        self._voices: dict[str, list[pygame.mixer.Channel]] = {}
+        self.played = 0
+        self.culled = 0
+        self.dropped = 0
+
+    def _setup(self) -> bool:
+        """Configure the mixer on first use, it may not be initialized when the world is created"""
+        if self._ready:
+            return True
+        if config.HEADLESS or not pygame.mixer.get_init():
+            return False
+
+        pygame.mixer.set_num_channels(config.AUDIO_CHANNELS)
+        pygame.mixer.set_reserved(LOOP_CHANNEL + 1)
+        self._channels = [pygame.mixer.Channel(i) for i in range(LOOP_CHANNEL + 1, config.AUDIO_CHANNELS)]
+        for path in SOUNDS:
+            assets.get_sound(path)
+        self._ready = True
+        return True
+
+    def _find_channel(self) -> pygame.mixer.Channel | None:
+        """An idle effect channel, pygame.mixer.find_channel would also hand out the reserved one"""
+        for channel in self._channels:
+            if not channel.get_busy():
+                return channel
+        return None
+
+    def get_stereo_volume(self, world_x: float, world_y: float, volume: float = 1.0) -> tuple[float, float]:
+        """Left and right volume of a sound at a world position, heard by the player"""
+        player = self._world.player
+        if not player:
+            return volume, volume
+
+        dx = world_x - player.world_x
+        dy = world_y - player.world_y
+        hearing_distance = config.AUDIO_HEARING_DISTANCE
+        volume *= max(0.0, 1 - math.sqrt(dx * dx + dy * dy) / hearing_distance)
+        pan = max(-1.0, min(1.0, dx / hearing_distance))
+        return volume * min(1.0, 1 - pan), volume * min(1.0, 1 + pan)
+
+    def play(self, path: str, world_x: float | None = None, world_y: float | None = None,
+             volume: float = 1.0) -> pygame.mixer.Channel | None:
+        """Play a sound effect, positioned in the world when coordinates are given"""
+        if not self._setup():
+            return None
+
+        left, right = volume, volume
+        if world_x is not None and world_y is not None:
+            left, right = self.get_stereo_volume(world_x, world_y, volume)
+            if max(left, right) < config.AUDIO_MIN_VOLUME:
+                self.culled += 1
+                return None
+
+        sound = assets.get_sound(path)
+        # Channels are shared, one that moved on to another sound is no longer a voice of this one
+        voices = [channel for channel in self._voices.get(path, ()) if channel.get_busy() and channel.get_sound() is sound]
+        if len(voices) >= config.AUDIO_MAX_VOICES_PER_SOUND:
+            self._voices[path] = voices
+            self.dropped += 1
+            return None
+
+        channel = self._find_channel()
+        if channel is None:
+            self.dropped += 1
+            return None
+
+        channel.play(sound)
+        channel.set_volume(left, right)
+        voices.append(channel)
+        self._voices[path] = voices
+        self.played += 1
+        return channel
+
+    def play_loop(self, path: str, volume: float = 1.0):
+        """Loop a sound on the reserved channel, replacing whatever loops there"""
+        if not self._setup():
+            return
+
+        channel = pygame.mixer.Channel(LOOP_CHANNEL)
+        channel.play(assets.get_sound(path), loops=-1)
+        channel.set_volume(volume)
+
+    def stop_loop(self):
+        if self._ready:
+            pygame.mixer.Channel(LOOP_CHANNEL).stop()
+
+    def get_stats(self) -> dict[str, int]:
+        return {'played': self.played, 'culled': self.culled, 'dropped': self.dropped}
@@ -0,0 +1,111 @@
+"""Runs many headless games in parallel, driven by a policy.
+
+Run with `python -m batch --games 1000 --policy hunter`. Every game is an
+independent World with its own seed, played by a policy from policies.py
+until it is over or hits the tick limit. Games are spread over a process
+pool, one per core by default, and each game's stats are printed as a
+JSON line as soon as it finishes.
+"""
+import argparse, json, multiprocessing, os, sys, time
+from typing import Iterator
+import config
+
+from world import World
+from player import Player
+from enemy import Enemy
+from wall import Wall
+from bonus import Bonus
+from policies import POLICIES, get_policy
+
+DEFAULT_TICKS = 60 * 60 * config.SIMULATION_RATE  # An hour of play
+
+
+def init_worker():
+    # Spawned workers import everything anew, forked ones already have it
+    config.HEADLESS = True
+
+
+def run_game(job: tuple[str, int, int]) -> dict:
+    """Play one game to its end or max_ticks, job is (policy spec, world seed, max ticks)"""
+    policy_spec, seed, max_ticks = job
+    world = World(Player, Enemy, Wall, Bonus, seed=seed)
+    world.dt = 1 / config.SIMULATION_RATE
+    world.start_game()
+    policy = get_policy(policy_spec)(seed)
+    policy.reset(world)
+
+    ticks = 0
+    start_time = time.perf_counter()
+    while ticks < max_ticks and not world.is_game_over():
+        world.step(*policy.act(world))
+        ticks += 1
+    elapsed = time.perf_counter() - start_time
+
+    player = world.player
+    return {
+        'seed': seed,
+        'policy': policy_spec,
+        'ticks': ticks,
+        'survival_time': round(ticks * world.dt, 3),
+        'kills': player.kills,
+        'lives': player.lives,
+        'game_over': world.is_game_over(),
+        'ticks_per_sec': round(ticks / max(elapsed, 1e-9)),
+    }
+
+
+def run_batch(policy_spec: str, games: int, max_ticks: int = DEFAULT_TICKS, workers: int | None = None,
+              seed: int = 0) -> Iterator[dict]:
+    """Yield the result of every game as it finishes, game i plays world seed + i"""
+    get_policy(policy_spec)  # Fail here rather than in every worker
+    jobs = [(policy_spec, seed + i, max_ticks) for i in range(games)]
+    with multiprocessing.Pool(workers or os.cpu_count(), initializer=init_worker) as pool:
+        # Games last seconds, one per task keeps the results streaming and the cores evenly loaded
+        yield from pool.imap_unordered(run_game, jobs)
+
+
+def summarize(results: list[dict], elapsed: float) -> dict:
+    count = max(len(results), 1)
+    ticks = sum(result['ticks'] for result in results)
+    return {
+        'games': len(results),
+        'mean_kills': round(sum(result['kills'] for result in results) / count, 3),
+        'mean_survival_time': round(sum(result['survival_time'] for result in results) / count, 3),
+        'games_over': sum(result['game_over'] for result in results),
+        'total_ticks_per_sec': round(ticks / max(elapsed, 1e-9)),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m batch', description="Torch Dungeon parallel headless games")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play")
+    parser.add_argument('--policy', default='hunter', help=f"{', '.join(POLICIES)} or module:Class")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="simulation steps before a game is cut off")
+    parser.add_argument('--workers', type=int, help="worker processes, one per core by default")
+    parser.add_argument('--seed', type=int, default=0, help="world seed of the first game, the others count up from it")
+    parser.add_argument('--output', help="write the per-game results as JSON lines to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        get_policy(args.policy)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.error(str(error))
+
+    config.HEADLESS = True
+    output = open(args.output, 'w') if args.output else sys.stdout
+    results = []
+    start_time = time.perf_counter()
+    try:
+        for result in run_batch(args.policy, args.games, args.ticks, args.workers, args.seed):
+            results.append(result)
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(json.dumps(summarize(results, time.perf_counter() - start_time)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+"""Scripted benchmarks for the simulation and rendering hot paths.
+
+Run with `python -m bench`. Every scenario steps a World at the fixed
+simulation rate and times World.update (through World.step) and World.draw
+separately. Rendering goes to an offscreen surface on the SDL dummy video
+driver, so no window is opened. Results are printed and can be written as
+JSON with --output to compare runs.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse, gc, json, math, platform, random, sys, time, tracemalloc
+import pygame, config
+
+from world import World, generate_chunk_layout
+from player import Player
+from enemy import Enemy
+from wall import Wall
+from bonus import Bonus, BONUS_TYPE_AID_KIT
+from bullet import Bullet
+from projectiles import TEAM_PLAYER
+
+BENCH_SEED = 1234
+WALK_CHUNKS = 200
+WALK_STEP = 40  # World units per step, faster than PLAYER_SPEED to keep the walk short
+FIREFIGHT_BULLETS = 50
+DENSE_LAYOUTS_PER_CHUNK = 4
+SHADOW_WALLS = 30  # Walls around the player in the shadows scenario
+SHADOW_BUDGET_MS = 2.0
+MEMORY_SAMPLE_SIZE = 1000  # Instances per entity type in the memory report
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 4) if samples else 0.0,
+        'p95_ms': round(percentile(samples, 95) * 1000, 4),
+        'p99_ms': round(percentile(samples, 99) * 1000, 4),
+        'max_ms': round(max(samples, default=0.0) * 1000, 4),
+    }
+
+
+def get_peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class GCMonitor:
+    """Counts garbage collections per generation and times the pauses"""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pauses: list[float] = []
+        self._started = 0.0
+
+    def _callback(self, phase: str, info: dict):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._started)
+            self.collections[info['generation']] += 1
+
+    def __enter__(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc_info):
+        gc.callbacks.remove(self._callback)
+
+    def summary(self) -> dict:
+        return {
+            'collections': self.collections,
+            'pause_total_ms': round(sum(self.pauses) * 1000, 4),
+            'pause_max_ms': round(max(self.pauses, default=0.0) * 1000, 4),
+        }
+
+
+def measure_entity_memory(count: int = MEMORY_SAMPLE_SIZE) -> dict[str, float]:
+    """Bytes allocated per instance of every entity type, textures and sounds are shared and not counted"""
+    world = World(Player, Enemy, Wall, Bonus, seed=BENCH_SEED)
+    world.start_game()
+    wall = next(iter(world.walls))
+    slots = [world.projectiles.spawn(0, 0, 1, 1) for _ in range(count)]
+
+    factories = {
+        'wall': lambda i: Wall(world, 0, 0, 30, 200, 'vertical'),
+        'enemy': lambda i: Enemy(world, wall, 1, 0),
+        'bonus': lambda i: Bonus(world, 0, 0, BONUS_TYPE_AID_KIT),
+        'bullet': lambda i: Bullet.from_slot(world, slots[i]),
+    }
+    result = {}
+    tracemalloc.start()
+    for name, factory in factories.items():
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [factory(i) for i in range(count)]
+        result[name] = round((tracemalloc.get_traced_memory()[0] - before) / count, 1)
+        del instances
+    tracemalloc.stop()
+    return result
+
+
+def count_entities(world: World) -> dict[str, int]:
+    return {
+        'walls': len(world.walls),
+        'enemies': len(world.enemies),
+        'bonuses': len(world.bonuses),
+        'bullets': world.projectiles.count(),
+        'resident_chunks': world.get_resident_chunk_count(),
+        'generated_chunks': len(world.generated_chunks),
+    }
+
+
+def teleport_player(world: World, x: float, y: float):
+    world.offset(x - world.player.world_x, y - world.player.world_y)
+    world.player.world_x = x
+    world.player.world_y = y
+
+
+def keep_player_alive(world: World):
+    world.player.lives = config.PLAYER_LIVES
+
+
+class Scenario:
+    """Scripted session, subclasses drive the player between steps"""
+    name = ''
+    description = ''
+    frames = 600
+
+    def setup(self, world: World):
+        pass
+
+    def before_step(self, world: World, frame: int):
+        pass
+
+    def measure(self, world: World) -> dict[str, float]:
+        """Extra per-frame timings in seconds, reported next to update and draw"""
+        return {}
+
+
+class WalkScenario(Scenario):
+    name = 'walk'
+    description = f"straight-line walk through {WALK_CHUNKS} chunks"
+    frames = WALK_CHUNKS * World.CHUNK_SIZE // WALK_STEP
+
+    def setup(self, world: World):
+        world.player.rotation = 270  # Facing +x
+
+    def before_step(self, world: World, frame: int):
+        # Scripted path ignores walls so the walk never gets stuck
+        teleport_player(world, world.player.world_x + WALK_STEP, world.player.world_y)
+        keep_player_alive(world)
+
+
+class FirefightScenario(Scenario):
+    name = 'firefight'
+    description = f"{FIREFIGHT_BULLETS} bullets in flight"
+
+    def before_step(self, world: World, frame: int):
+        player = world.player
+        keep_player_alive(world)
+        world.player.rotate(0.5)
+
+        # Top the player's bullets back up to a fan of FIREFIGHT_BULLETS
+        missing = FIREFIGHT_BULLETS - world.projectiles.count(TEAM_PLAYER)
+        for i in range(missing):
+            angle = math.radians((frame * 7 + i * 360 / FIREFIGHT_BULLETS) % 360)
+            world.projectiles.spawn(player.world_x, player.world_y,
+                                    player.world_x + math.sin(angle) * 100,
+                                    player.world_y + math.cos(angle) * 100,
+                                    TEAM_PLAYER, player._id)
+
+
+class NightVisionScenario(Scenario):
+    name = 'night_vision'
+    description = "night vision on, everything nearby visible"
+
+    def setup(self, world: World):
+        world.player.start_night_vision()
+
+    def before_step(self, world: World, frame: int):
+        world.player.night_vision_timer = config.GOOGLES_ACTIVE_TIME
+        world.player.rotate(0.5)
+        keep_player_alive(world)
+
+
+class DenseWorldScenario(Scenario):
+    name = 'dense'
+    description = f"{DENSE_LAYOUTS_PER_CHUNK}x wall and enemy density"
+
+    def setup(self, world: World):
+        # Overlay layouts from other seeds on the chunks around the player
+        for chunk in list(world.generated_chunks):
+            for extra in range(1, DENSE_LAYOUTS_PER_CHUNK):
+                world.attach_chunk_layout(generate_chunk_layout(world.seed + extra, *chunk, world.CHUNK_SIZE))
+        world.player.start_night_vision()
+
+    def before_step(self, world: World, frame: int):
+        world.player.night_vision_timer = config.GOOGLES_ACTIVE_TIME
+        world.player.rotate(0.5)
+        keep_player_alive(world)
+
+
+class ShadowScenario(Scenario):
+    name = 'shadows'
+    description = f"torch visibility polygon among {SHADOW_WALLS} walls, budget {SHADOW_BUDGET_MS} ms"
+
+    def setup(self, world: World):
+        # Generated chunks are too sparse, scatter short walls within the torch radius instead
+        rng = random.Random(BENCH_SEED)
+        player = world.player
+        reach = config.TORCH_RADIUS
+        placed = 0
+        while placed < SHADOW_WALLS:
+            width, height = rng.choice(((30, 60), (60, 30)))
+            x = player.world_x + rng.uniform(-reach, reach - width)
+            y = player.world_y + rng.uniform(-reach, reach - height)
+            # Keep clear of the strip the player walks along
+            if y < player.world_y + 40 and y + height > player.world_y - 40 and abs(x + width / 2 - player.world_x - 25) < 60 + width / 2:
+                continue
+            orientation = 'vertical' if height > width else 'horizontal'
+            world.walls.append(world._Wall(world, x, y, width, height, orientation))
+            placed += 1
+
+    def before_step(self, world: World, frame: int):
+        # Small steps back and forth keep the player among the same walls, moving every frame
+        dx = 1 if frame % 100 < 50 else -1
+        teleport_player(world, world.player.world_x + dx, world.player.world_y)
+        keep_player_alive(world)
+
+    def measure(self, world: World) -> dict[str, float]:
+        visibility = world.torch_visibility
+        visibility.clear()
+        start = time.perf_counter()
+        visibility.update()
+        return {'light_polygon': time.perf_counter() - start}
+
+
+SCENARIOS: dict[str, type[Scenario]] = {
+    scenario.name: scenario for scenario in (WalkScenario, FirefightScenario, NightVisionScenario, DenseWorldScenario,
+                                             ShadowScenario)
+}
+
+
+def run_scenario(scenario: Scenario, frames: int, render: bool) -> dict:
+    world = World(Player, Enemy, Wall, Bonus, seed=BENCH_SEED)
+    world.dt = 1 / config.SIMULATION_RATE
+    world.start_game()
+    scenario.setup(world)
+
+    screen = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT)) if render else None
+    update_times = []
+    draw_times = []
+    extra_times: dict[str, list[float]] = {}
+
+    gc_monitor = GCMonitor()
+    with gc_monitor:
+        for frame in range(frames):
+            scenario.before_step(world, frame)
+
+            start = time.perf_counter()
+            world.step()
+            update_times.append(time.perf_counter() - start)
+
+            if screen is not None:
+                start = time.perf_counter()
+                world.draw(screen)
+                draw_times.append(time.perf_counter() - start)
+
+            for name, elapsed in scenario.measure(world).items():
+                extra_times.setdefault(name, []).append(elapsed)
+
+    result = {
+        'scenario': scenario.name,
+        'description': scenario.description,
+        'frames': frames,
+        'update': summarize(update_times),
+        'entities': count_entities(world),
+        'chunk_stats': dict(world.chunk_stats),
+        'gc': gc_monitor.summary(),
+    }
+    if screen is not None:
+        result['draw'] = summarize(draw_times)
+    for name, samples in extra_times.items():
+        result[name] = summarize(samples)
+    return result
+
+
+def print_result(result: dict):
+    line = f"{result['scenario']:>14}  update mean {result['update']['mean_ms']:7.3f} ms  p95 {result['update']['p95_ms']:7.3f}  p99 {result['update']['p99_ms']:7.3f}"
+    if 'draw' in result:
+        line += f"  |  draw mean {result['draw']['mean_ms']:7.3f} ms  p95 {result['draw']['p95_ms']:7.3f}  p99 {result['draw']['p99_ms']:7.3f}"
+    print(line)
+    for name, timings in result.items():
+        if name not in ('update', 'draw') and isinstance(timings, dict) and 'mean_ms' in timings:
+            print(f"{'':>14}  {name} mean {timings['mean_ms']:7.3f} ms  p95 {timings['p95_ms']:7.3f}  p99 {timings['p99_ms']:7.3f}")
+    print(f"{'':>14}  entities {result['entities']}")
+    print(f"{'':>14}  gc collections {result['gc']['collections']}  pauses total {result['gc']['pause_total_ms']:.3f} ms"
+          f"  max {result['gc']['pause_max_ms']:.3f} ms")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description="Torch Dungeon benchmarks")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"scenarios to run ({', '.join(SCENARIOS)}), all of them by default")
+    parser.add_argument('--frames', type=int, help="override the number of frames per scenario")
+    parser.add_argument('--headless', action='store_true', help="only time World.update, no rendering")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--memory', action='store_true', help="also report the bytes allocated per entity")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.headless:
+        config.HEADLESS = True
+    else:
+        pygame.init()
+        # A display mode is needed to convert textures, the dummy driver never shows it
+        pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        scenario = SCENARIOS[name]()
+        result = run_scenario(scenario, args.frames or scenario.frames, render=not args.headless)
+        print_result(result)
+        results.append(result)
+
+    # The peak only ever grows, so it belongs to the whole run rather than to any one scenario
+    peak_rss_kb = get_peak_rss_kb()
+    print(f"{'peak rss':>14}  {peak_rss_kb} KB")
+
+    memory = None
+    if args.memory:
+        memory = measure_entity_memory()
+        print(f"{'memory':>14}  " + '  '.join(f"{name} {size:.0f} B" for name, size in memory.items()))
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'headless': config.HEADLESS,
+            'peak_rss_kb': peak_rss_kb,
+            'results': results,
+        }
+        if memory is not None:
+            report['entity_memory_bytes'] = memory
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
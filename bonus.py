@@ -1,45 +1,50 @@
 import math
-import pygame, random, config
+import pygame, config
 from screen_object import ScreenObject
+from asset_registry import assets
 from world import World
 
 BONUS_TYPE_AID_KIT = "aid_kit"
 BONUS_TYPE_GOGGLES = "goggles"
 
 class Bonus(ScreenObject):
-    def __init__(self, world: World, world_x: float, world_y: float):
+    __slots__ = ('active', 'type', 'torch_radius', 'surface')
+
+    def __init__(self, world: World, world_x: float, world_y: float, bonus_type: str | None = None):
         super().__init__(world, world_x, world_y, config.AID_KIT_SIZE, config.AID_KIT_SIZE)
-        self.pickup_sound = pygame.mixer.Sound(config.BONUS_PICKUP_SOUND)
-        self.active = True
-        self.type = random.choices([BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES], weights=[5, 1], k=1)[0]
         self.torch_radius = config.TORCH_RADIUS
+        self._set_type(bonus_type)
 
-        try:
-            if self.type == BONUS_TYPE_AID_KIT:
-                self.surface = pygame.image.load(config.AID_KIT_TEXTURE).convert_alpha()
-                self.surface = pygame.transform.scale(self.surface, (config.AID_KIT_SIZE, config.AID_KIT_SIZE))
-            elif self.type == BONUS_TYPE_GOGGLES:
-                self.surface = pygame.image.load(config.GOGGLES_TEXTURE).convert_alpha()
-                self.surface = pygame.transform.scale(self.surface, (config.GOGGLES_SIZE, config.GOGGLES_SIZE))
-        
-        except pygame.error:
-            self.surface = None
+    def reset(self, world: World, world_x: float, world_y: float, bonus_type: str | None = None):
+        """Reuse a released bonus from the world's pool for a new drop"""
+        ScreenObject.__init__(self, world, world_x, world_y, config.AID_KIT_SIZE, config.AID_KIT_SIZE)
+        self._set_type(bonus_type)
+
+    def _set_type(self, bonus_type: str | None):
+        self.active = True
+        self.type = bonus_type or self._world.rng.choices([BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES], weights=[5, 1], k=1)[0]
+
+        self.surface = None
+        if self.type == BONUS_TYPE_AID_KIT:
+            self.surface = assets.get_scaled(config.AID_KIT_TEXTURE, (config.AID_KIT_SIZE, config.AID_KIT_SIZE))
+        elif self.type == BONUS_TYPE_GOGGLES:
+            self.surface = assets.get_scaled(config.GOGGLES_TEXTURE, (config.GOGGLES_SIZE, config.GOGGLES_SIZE))
         
     def check_player_pickup(self) -> bool:
-        """Check if player picks up the aid kit"""
-        player = self._world.player
-        if not self.active or not player:
+        """Check if a player picks up the aid kit"""
+        if not self.active:
             return False
-        
-        player_rect = player.get_collision_rect()
-        
-        if (self.check_collision(*player_rect)):
+
+        for player in self._world.players:
+            if player.lives <= 0 or not self.check_collision(*player.get_collision_rect()):
+                continue
+
             if self.type == BONUS_TYPE_AID_KIT:
                 player.heal(config.AID_KIT_HEAL_AMOUNT)
             elif self.type == BONUS_TYPE_GOGGLES:
                 player.start_night_vision()
 
-            self.pickup_sound.play()
+            self._world.audio.play(config.BONUS_PICKUP_SOUND)
             self.active = False
             return True
             
@@ -49,11 +54,7 @@ class Bonus(ScreenObject):
         if not self.active or not self.surface:
             return
 
-        player = self._world.player
-        distance = math.sqrt((self.world_x - player.world_x)**2 + (self.world_y - player.world_y)**2) if player else 0
-        should_draw = (distance <= self.torch_radius or (player and player.night_vision_timer > 0)) and not self._world.is_game_over()
-        
-        if not should_draw:
+        if not self._world.is_lit_for_player(self.world_x, self.world_y, self.torch_radius):
             return
 
         screen_x, screen_y = self.get_screen_coordinates()
@@ -62,4 +63,4 @@ class Bonus(ScreenObject):
 
     def update(self):
         if self.check_player_pickup():
-            self._world.bonuses.remove(self)
\ No newline at end of file
+            self._world.despawn(self)
\ No newline at end of file
@@ -1,47 +1,109 @@
-from operator import is_
 from screen_object import ScreenObject
-from wall import Wall
 from world import World
-import math, pygame, config
+from projectiles import ProjectileStore, TEAM_ENEMY, TEAM_PLAYER
+import pygame, config
 
 class Bullet(ScreenObject):
-    def __init__(self, world: World, world_x, world_y, target_world_x, target_world_y, color=(255, 0, 0), is_enemy=True):
+    """Thin view over one slot of the world's ProjectileStore.
+
+    Creating a Bullet fires a new projectile; the store moves it and resolves
+    its hits every tick, whoever fired it. A view stays bound to its slot
+    and generation, once its bullet is gone it reports itself inactive.
+    """
+    __slots__ = ('_store', 'slot', 'generation', 'size', 'target_world_x', 'target_world_y')
+
+    def __init__(self, world: World, world_x, world_y, target_world_x, target_world_y, color=(255, 0, 0), is_enemy=True, owner_id: int = 0):
+        store: ProjectileStore = world.projectiles
+        slot = store.spawn(world_x, world_y, target_world_x, target_world_y,
+                           TEAM_ENEMY if is_enemy else TEAM_PLAYER, owner_id, color)
+        self._attach(world, slot)
         super().__init__(world, world_x, world_y, config.BULLET_SIZE, config.BULLET_SIZE)
         self.target_world_x = target_world_x
         self.target_world_y = target_world_y
-        self.color = color
-        self.is_enemy = is_enemy
-        self.speed = config.ENEMY_BULLET_SPEED if is_enemy else config.PLAYER_BULLET_SPEED
-        
-        # Calculate direction vector
-        dx = target_world_x - world_x
-        dy = target_world_y - world_y
-        length = math.sqrt(dx * dx + dy * dy)
-        # Store normalized direction vector
-        self.dx = dx / length if length > 0 else 0
-        self.dy = dy / length if length > 0 else 0
+
+    @classmethod
+    def from_slot(cls, world: World, slot: int) -> 'Bullet':
+        """View of a bullet that is already in the store"""
+        bullet = cls.__new__(cls)
+        bullet._attach(world, slot)
+        ScreenObject.__init__(bullet, world, world.projectiles.x[slot], world.projectiles.y[slot], config.BULLET_SIZE, config.BULLET_SIZE)
+        return bullet
+
+    def _attach(self, world: World, slot: int):
+        self._store: ProjectileStore = world.projectiles
+        self.slot = slot
+        self.generation = int(self._store.generation[slot])
         self.size = config.BULLET_SIZE
-        self.active = True
-
-    def move(self):
-        # Calculate actual movement based on speed and delta time
-        move_x = self.dx * self.speed * self._world.dt
-        move_y = self.dy * self.speed * self._world.dt
-
-        # Check collisions with adjusted wall positions
-        collision = False
-        collision_rect = self.get_collision_rect(move_x, move_y)
-        walls: list[Wall] = self._world.walls
-        for wall in walls:
-            collision = wall.check_collision(*collision_rect)
-            if collision:
-                break
-        
-        if collision:
-            self.active = False
-        else:
-            self.world_x += move_x
-            self.world_y += move_y
+
+    @property
+    def world_x(self) -> float:
+        return float(self._store.x[self.slot])
+
+    @world_x.setter
+    def world_x(self, value: float):
+        self._store.x[self.slot] = value
+
+    @property
+    def world_y(self) -> float:
+        return float(self._store.y[self.slot])
+
+    @world_y.setter
+    def world_y(self, value: float):
+        self._store.y[self.slot] = value
+
+    @property
+    def prev_world_x(self) -> float:
+        return float(self._store.prev_x[self.slot])
+
+    @prev_world_x.setter
+    def prev_world_x(self, value: float):
+        self._store.prev_x[self.slot] = value
+
+    @property
+    def prev_world_y(self) -> float:
+        return float(self._store.prev_y[self.slot])
+
+    @prev_world_y.setter
+    def prev_world_y(self, value: float):
+        self._store.prev_y[self.slot] = value
+
+    @property
+    def active(self) -> bool:
+        return self._store.is_alive(self.slot, self.generation)
+
+    @active.setter
+    def active(self, value: bool):
+        if not value and self.active:
+            self._store.kill(self.slot)
+
+    @property
+    def is_enemy(self) -> bool:
+        return bool(self._store.team[self.slot] == TEAM_ENEMY)
+
+    @property
+    def color(self) -> tuple[int, int, int]:
+        return tuple(self._store.color[self.slot].tolist())
+
+    @property
+    def speed(self) -> float:
+        return config.ENEMY_BULLET_SPEED if self.is_enemy else config.PLAYER_BULLET_SPEED
+
+    @property
+    def dx(self) -> float:
+        return float(self._store.vx[self.slot]) / self.speed
+
+    @property
+    def dy(self) -> float:
+        return float(self._store.vy[self.slot]) / self.speed
+
+    def save_previous_position(self):
+        self.prev_world_x = self.world_x
+        self.prev_world_y = self.world_y
+
+    def get_render_position(self) -> tuple[float, float]:
+        alpha = self._world.render_alpha
+        prev_x, prev_y = self.prev_world_x, self.prev_world_y
+        return prev_x + (self.world_x - prev_x) * alpha, prev_y + (self.world_y - prev_y) * alpha
 
     def draw(self, screen: pygame.Surface):
         screen_x, screen_y = self.get_screen_coordinates()
@@ -49,23 +111,3 @@ class Bullet(ScreenObject):
         
         if config.DEBUG:
             pygame.draw.rect(screen, (0, 255, 0), self.get_screen_collision_rect(), 1)
-
-    def check_hits_player(self):
-        if not self.is_enemy:
-            return False
-            
-        player = self._world.player
-        if not player:
-            return False
-
-        return player.check_collision(*self.get_collision_rect())
-
-    def check_hits_enemies(self):
-        if self.is_enemy:
-            return []
-            
-        hits = []
-        for enemy in self._world.enemies:
-            if not enemy.dead and enemy.check_collision(*self.get_collision_rect()):
-                hits.append(enemy)
-        return hits
@@ -0,0 +1,120 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+import math, time
+import config
+
+
+class ChunkLoader:
+    """Generates chunk layouts on a worker thread, ahead of the player.
+
+    Layouts are pure data, so the worker only runs generate_chunk_layout.
+    Every step the ring of chunks that becomes active after the next
+    boundary crossing in the player's heading is requested, and finished
+    layouts are attached as dormant chunks within a time budget per step.
+    By the time the player crosses, the new ring is already resident.
+
+    Without background loading (headless runs, which must stay reproducible,
+    and platforms without threads) layouts are generated when they are
+    needed, on the calling thread.
+    """
+
+    def __init__(self, world, generate: Callable[[int, float, float, int], list],
+                 background: bool = config.CHUNK_BACKGROUND_LOADING):
+        self._world = world
+        self._generate = generate  # generate_chunk_layout, only touches its arguments
+        self.background = background and not config.HEADLESS
+        self._executor: ThreadPoolExecutor | None = None
+        # (seed, chunk_x, chunk_y) -> layout being generated or ready
+        self._pending: dict[tuple[int, float, float], Future] = {}
+        self.prefetched = 0
+        self.attached = 0
+        self.sync_loads = 0
+
+    def clear(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+
+    def shutdown(self):
+        self.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_layout(self, chunk_x: float, chunk_y: float) -> list:
+        """Layout of a chunk, prefetched if it is ready and generated right away otherwise"""
+        world = self._world
+        future = self._pending.pop((world.seed, chunk_x, chunk_y), None)
+        if future is not None and future.done() and not future.cancelled():
+            return future.result()
+
+        # Generating it here is faster than waiting behind the worker's queue
+        if future is not None:
+            future.cancel()
+        self.sync_loads += 1
+        return self._generate(world.seed, chunk_x, chunk_y, world.CHUNK_SIZE)
+
+    def _request(self, chunk_x: float, chunk_y: float):
+        world = self._world
+        key = (world.seed, chunk_x, chunk_y)
+        if key in self._pending:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chunk-loader')
+        self._pending[key] = self._executor.submit(self._generate, world.seed, chunk_x, chunk_y, world.CHUNK_SIZE)
+        self.prefetched += 1
+
+    def get_heading(self) -> tuple[float, float]:
+        """Direction the player moved in last step, or faces when standing still"""
+        player = self._world.player
+        dx = player.world_x - player.prev_world_x
+        dy = player.world_y - player.prev_world_y
+        if dx or dy:
+            return dx, dy
+
+        rotation_rad = math.radians(player.rotation)
+        return math.sin(rotation_rad), math.cos(rotation_rad)
+
+    def prefetch(self, current_chunk_x: float, current_chunk_y: float):
+        """Request the chunks that become active when the player enters the next chunk ahead"""
+        if not self.background:
+            return
+
+        world = self._world
+        heading_x, heading_y = self.get_heading()
+        length = math.hypot(heading_x, heading_y)
+        next_chunk_x = current_chunk_x + round(heading_x / length)
+        next_chunk_y = current_chunk_y + round(heading_y / length)
+        if (next_chunk_x, next_chunk_y) == (current_chunk_x, current_chunk_y):
+            return
+
+        radius = config.CHUNK_ACTIVE_RADIUS
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                chunk = (next_chunk_x + dx, next_chunk_y + dy)
+                if not world.is_chunk_resident(*chunk):
+                    self._request(*chunk)
+
+    def attach_ready(self, budget: float = config.CHUNK_ATTACH_BUDGET):
+        """Attach finished layouts as dormant chunks until budget seconds are spent"""
+        if not self._pending:
+            return
+
+        world = self._world
+        started = time.perf_counter()
+        for (seed, chunk_x, chunk_y), future in list(self._pending.items()):
+            if time.perf_counter() - started >= budget:
+                break
+            if seed != world.seed or not future.done():
+                continue
+            if world.is_chunk_resident(chunk_x, chunk_y):
+                del self._pending[(seed, chunk_x, chunk_y)]
+                continue
+
+            # get_layout picks up the finished layout
+            world.preload_chunk(chunk_x, chunk_y)
+            self.attached += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {'prefetched': self.prefetched, 'attached': self.attached, 'sync_loads': self.sync_loads}
@@ -7,8 +7,29 @@ ASSETS_FOLDER: Final = os.path.join('assets')
 SCREEN_WIDTH: Final = 800
 SCREEN_HEIGHT: Final = 600
 
-FRAMERATE: Final = 60
+FRAMERATE: Final = 60  # Render rate
+SIMULATION_RATE: Final = 60  # Fixed simulation steps per second
+MAX_SIMULATION_STEPS: Final = 5  # Catch-up steps per rendered frame before the simulation slows down
+REPLAY_HASH_INTERVAL: Final = 60  # Simulation steps between state hashes in input recordings
 DEBUG = False
+# Run the simulation without display, audio or textures (set by --headless too)
+HEADLESS = os.environ.get('TORCH_DUNGEON_HEADLESS', '') not in ('', '0')
+# Only redraw and present the parts of the screen that changed, a moving camera still redraws everything
+DIRTY_RECT_RENDERING = False
+
+# Profiler settings
+PROFILER_HISTORY: Final = 120  # Frames shown in the F3 frame-time graph
+PROFILER_RECORD_FRAMES: Final = 300  # Frames written to a file by F4 (Shift+F4 adds a cProfile capture)
+
+# Asset settings
+ASSET_VARIANT_CACHE_SIZE: Final = 256  # Scaled/rotated surfaces kept in the LRU
+ROTATION_STEP: Final = 2  # Degrees between cached sprite rotations, must divide 360
+
+# Audio settings
+AUDIO_CHANNELS: Final = 16  # Mixer channels, one of them is reserved for the torch loop
+AUDIO_MAX_VOICES_PER_SOUND: Final = 4  # Copies of one sound playing at once, more are dropped
+AUDIO_HEARING_DISTANCE: Final = 400  # Sounds fade out linearly up to this distance from the player
+AUDIO_MIN_VOLUME: Final = 0.02  # Quieter positional sounds are culled before taking a channel
 
 HEART_TEXTURE: Final = os.path.join(ASSETS_FOLDER, 'heart.png')
 
@@ -16,14 +37,27 @@ HEART_TEXTURE: Final = os.path.join(ASSETS_FOLDER, 'heart.png')
 WALL_TEXTURE: Final = os.path.join(ASSETS_FOLDER, 'wall.jpg')
 FLOOR_TEXTURE: Final = os.path.join(ASSETS_FOLDER, 'floor.png')
 TORCH_RADIUS: Final = 200
+TORCH_FLICKER: Final = 5  # Torch radius varies by up to this much every frame
+LIGHT_RAYS: Final = 128  # Evenly spaced rays of the torch visibility polygon, on top of the ones to wall corners
 TORCH_SOUND: Final = os.path.join(ASSETS_FOLDER, 'torch.ogg')
 GAME_OVER_SOUND: Final = os.path.join(ASSETS_FOLDER, 'game-over.ogg')
+WORLD_SEED = None  # Fixed seed for reproducible worlds, a random one is picked per game when None
+CHUNK_ACTIVE_RADIUS: Final = 1  # Chunks around the player that are generated and updated
+CHUNK_RESIDENT_RADIUS: Final = 3  # Chunks further away than this are evicted
+MAX_RESIDENT_CHUNKS: Final = 64  # Hard cap on chunks with entities in memory
+CHUNK_KEEP_EVICTED_RECORDS: Final = True  # False drops evicted chunks entirely, they are generated anew on return
+CHUNK_BACKGROUND_LOADING: Final = sys.platform != 'emscripten'  # Generate chunks ahead of the player on a worker thread
+CHUNK_ATTACH_BUDGET: Final = 0.002  # Seconds per step spent attaching prefetched chunks
+CHUNK_LAYER_CACHE_SIZE: Final = 12  # Chunks whose floor and walls stay baked, 2.5 MB each
+SNAPSHOT_FILE: Final = 'torch-dungeon.sav'  # Written by F6 and read by F7
 COLOR_DARK: Final = (0, 0, 0, 225)
 COLOR_NIGHT_VISION: Final = (0, 150, 0, 160)
 
 # Bullet settings
 BULLET_SIZE: Final = 6
 BULLET_SOUND: Final = os.path.join(ASSETS_FOLDER, 'blaster.ogg')
+PROJECTILE_INITIAL_CAPACITY: Final = 256  # Slots in the projectile arrays, doubled when full
+POOL_MAX_SIZE: Final = 256  # Released bonuses kept for reuse
 
 # Player settings
 PLAYER_SPEED: Final = 300  # Units per second
@@ -68,3 +102,16 @@ AID_KIT_HEAL_AMOUNT: Final = 2
 GOGGLES_SIZE: Final = 32
 GOGGLES_TEXTURE: Final = os.path.join(ASSETS_FOLDER, 'goggles.png')
 GOOGLES_ACTIVE_TIME: Final = 20  # Seconds of night vision mode
+
+# Training environment settings
+OBS_GRID_SIZE: Final = 32  # Cells along each side of the occupancy grid observation
+OBS_CELL_SIZE: Final = 25  # World units per cell, the grid covers a chunk around the player
+ENV_MAX_TICKS: Final = 5 * 60 * SIMULATION_RATE  # Steps before an episode is truncated
+ENV_FRAME_SKIP: Final = 1  # Simulation steps per env step, the action is repeated for each of them
+
+# Server settings
+SERVER_HOST: Final = '127.0.0.1'
+SERVER_PORT: Final = 7777
+SERVER_TICK_RATE: Final = 30  # Simulation steps and snapshots per second
+SERVER_SNAPSHOT_HISTORY: Final = 32  # Snapshots kept per client as delta baselines, about a second
+SERVER_MAX_WRITE_BUFFER: Final = 64 * 1024  # Bytes queued for a client before its snapshots are skipped
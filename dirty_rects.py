@@ -0,0 +1,92 @@
+import pygame, config
+
+SCREEN_RECT = pygame.Rect(0, 0, config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+
+
+def merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    """Clip rects to the screen and union the overlapping ones until none overlap"""
+    merged = [rect.clip(SCREEN_RECT) for rect in rects]
+    merged = [rect for rect in merged if rect.width and rect.height]
+    changed = True
+    while changed:
+        changed = False
+        for i, rect in enumerate(merged):
+            overlapping = rect.collidelistall(merged[i + 1:])
+            if overlapping:
+                for index in reversed(overlapping):
+                    rect = rect.union(merged.pop(i + 1 + index))
+                merged[i] = rect
+                changed = True
+                break
+    return merged
+
+
+class DirtyRectTracker:
+    """Decides which parts of the screen have to be redrawn and presented.
+
+    Every frame the screen areas of whatever can change with the camera
+    still are collected: the torch, the player, enemies, bonuses, bullets
+    and HUD changes. Together with last frame's areas, which have to be
+    cleared, they are the dirty rects. Returns None instead when the whole
+    screen changed: the camera moved, night vision or game over toggled,
+    or the debug overlay is on.
+    """
+
+    def __init__(self):
+        self._previous_rects: list[pygame.Rect] = []
+        self._previous_key = None
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def reset(self):
+        self._previous_key = None
+
+    def _collect(self, world) -> list[pygame.Rect]:
+        rects = []
+        player = world.player
+        screen_x, screen_y = player.get_screen_coordinates()
+
+        # The flickering torch covers the player sprite
+        reach = config.TORCH_RADIUS + config.TORCH_FLICKER + 1
+        rects.append(pygame.Rect(screen_x - reach, screen_y - reach, reach * 2, reach * 2))
+
+        # The same neighborhood World.draw draws from
+        center_x, center_y = -world.offset_x, -world.offset_y
+        for enemy in world.get_neighboring_objects(center_x, center_y, world.enemies):
+            x, y = enemy.get_screen_coordinates()
+            # Rotated sprites grow up to the texture diagonal, the pivot is off center
+            half = max(enemy.texture_size, enemy.blood_texture_size)
+            rects.append(pygame.Rect(x - half, y - half, half * 2, half * 2))
+
+        for bonus in world.get_neighboring_objects(center_x, center_y, world.bonuses):
+            x, y = bonus.get_screen_coordinates()
+            half = config.AID_KIT_SIZE
+            rects.append(pygame.Rect(x - half, y - half, half * 2, half * 2))
+
+        size = config.BULLET_SIZE * 2
+        _, bullet_x, bullet_y = world.projectiles.get_screen_positions()
+        for x, y in zip(bullet_x.tolist(), bullet_y.tolist()):
+            rects.append(pygame.Rect(x - size, y - size, size * 2, size * 2))
+
+        return rects
+
+    def get_dirty_rects(self, world, hud) -> list[pygame.Rect] | None:
+        hud_rects = hud.update(world)
+        player = world.player
+        if not player:
+            self.reset()
+            return None
+
+        key = (world.get_render_offset(), player.night_vision_timer > 0, world.is_game_over())
+        # The debug overlay changes every frame
+        full_redraw = key != self._previous_key or config.DEBUG
+        self._previous_key = key
+
+        rects = self._collect(world)
+        dirty = None if full_redraw else merge_rects(self._previous_rects + rects + hud_rects)
+        self._previous_rects = rects
+        if dirty is None:
+            self.full_frames += 1
+        else:
+            self.partial_frames += 1
+        return dirty
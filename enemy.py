@@ -5,20 +5,31 @@ from screen_object import ScreenObject
 from world import World
 from wall import Wall
 from bullet import Bullet
-import random, math, pygame, geometry
+from projectiles import TEAM_ENEMY
+import bisect, math, pygame, geometry
+from asset_registry import assets
 from player import Player
 
 class Enemy(ScreenObject):
-    def __init__(self, world: World, wall: Wall):        
+    __slots__ = ('wall', 'size', 'speed', 'direction', 'dead', 'dead_timer', 'shoot_delay', 'torch_radius',
+                 'texture_size', 'blood_texture_size', 'surface', 'blood_surface', 'texture_pivot', '_path_walls',
+                 '_path_enemies')
+
+    def __init__(self, world: World, wall: Wall, wall_side: int | None = None, patrol_offset: int | None = None):
         self.wall = wall
         self.size = config.ENEMY_SIZE
-        wall_side = random.choice([1, -1])
+        if wall_side is None:
+            wall_side = world.rng.choice([1, -1])
 
         if self.wall.orientation == 'vertical':
+            if patrol_offset is None:
+                patrol_offset = world.rng.randint(0, math.floor(self.wall.height))
             world_x = self.wall.world_x - wall_side * (self.wall.width / 2 + self.size / 2)
-            world_y = random.randint(math.floor(self.wall.world_y), math.floor(self.wall.world_y + self.wall.height))
+            world_y = math.floor(self.wall.world_y) + patrol_offset
         else:
-            world_x = random.randint(math.floor(self.wall.world_x), math.floor(self.wall.world_x + self.wall.width))
+            if patrol_offset is None:
+                patrol_offset = world.rng.randint(0, math.floor(self.wall.width))
+            world_x = math.floor(self.wall.world_x) + patrol_offset
             world_y = self.wall.world_y - wall_side * (self.wall.height / 2 + self.size / 2)
 
         super().__init__(world, world_x, world_y, self.size, self.size)
@@ -29,21 +40,36 @@ class Enemy(ScreenObject):
         self.blood_texture_size = config.ENEMY_BLOOD_TEXTURE_SIZE
         self.dead_timer = 0
         self.shoot_delay = 0
-        self.bullets: list[Bullet] = []
-        self.bullet_sound = pygame.mixer.Sound(config.BULLET_SOUND)
-        self.hurt_sound = pygame.mixer.Sound(config.ENEMY_HURT_SOUND)
         self.dead = False
 
-        enemy_surface = pygame.image.load(config.ENEMY_TEXTURE).convert_alpha()
-        self.surface = pygame.transform.scale(enemy_surface, (self.texture_size, self.texture_size))
-
-        blood_surface = pygame.image.load(config.ENEMY_BLOOD_TEXTURE).convert_alpha()
-        self.blood_surface = pygame.transform.scale(blood_surface, (self.blood_texture_size, self.blood_texture_size))
+        self.surface = assets.get_scaled(config.ENEMY_TEXTURE, (self.texture_size, self.texture_size))
+        texture_x, texture_y = config.ENEMY_TEXTURE_CENTER
+        self.texture_pivot = (texture_x - self.texture_size / 2, texture_y - self.texture_size / 2)
+        self.blood_surface = assets.get_scaled(config.ENEMY_BLOOD_TEXTURE, (self.blood_texture_size, self.blood_texture_size))
 
         self.direction = 1
+        self._path_walls = (None, None, [])  # Nearby walls list and patrol line they were filtered for, walls across it
+        self._path_enemies = (None, None, ([], [], []))  # The same for get_path_enemies
+
+    @property
+    def bullets(self) -> list[Bullet]:
+        """Views of the bullets this enemy fired that are still flying"""
+        return self._world.projectiles.get_bullets(self._id)
+
+    def get_state(self) -> tuple:
+        """Dynamic state kept for the enemy while its chunk is evicted"""
+        return (self.world_x, self.world_y, self.direction, self.dead, self.dead_timer, self.shoot_delay)
+
+    def set_state(self, state: tuple):
+        self.world_x, self.world_y, self.direction, self.dead, self.dead_timer, self.shoot_delay = state
+        self.save_previous_position()
 
     def can_see_player(self):
-        player: Player | None = self._world.player
+        # Answered once per tick for all active enemies by World.update_visibility
+        return self._world.can_enemy_see_player(self)
+
+    def compute_can_see_player(self, player: Player | None = None):
+        player = player or self._world.player
         if not player or self._world.is_game_over():
             return False
 
@@ -67,6 +93,55 @@ class Enemy(ScreenObject):
                 return False
         return True
 
+    def get_path_walls(self, nearby_walls: list) -> list:
+        """The nearby walls across the enemy's patrol line, cached until the walls or the line change"""
+        vertical = self.wall.orientation == 'vertical'
+        line = self._world_x if vertical else self._world_y
+        source, cached_line, path_walls = self._path_walls
+        if source is nearby_walls and cached_line == line:
+            return path_walls
+
+        half_size = (self.width if vertical else self.height) / 2
+        path_walls = []
+        for wall in nearby_walls:
+            left, top, width, height = wall.get_collision_rect()
+            start, size = (left, width) if vertical else (top, height)
+            # Truncating to integers moves an edge by less than 2, walls further off the line never collide
+            if start < line + half_size + 2 and line - half_size < start + size + 2:
+                path_walls.append(wall)
+        self._path_walls = (nearby_walls, line, path_walls)
+        return path_walls
+
+    def get_path_enemies(self, nearby_enemies: list) -> tuple[list, list[float], list]:
+        """The nearby enemies that may get in the way, as (parallel, crossing lines, crossing).
+
+        Enemies only move along their patrol line. Parallel ones are kept
+        when their line is close to this enemy's, the ones patrolling across
+        are sorted by line so move() can bisect the few near its position.
+        Cached until the enemies or the line change.
+        """
+        vertical = self.wall.orientation == 'vertical'
+        line = self._world_x if vertical else self._world_y
+        source, cached_line, path_enemies = self._path_enemies
+        if source is nearby_enemies and cached_line == line:
+            return path_enemies
+
+        reach = (self.width if vertical else self.height) + 2
+        parallel = []
+        crossing = []
+        for enemy in nearby_enemies:
+            if enemy is self:
+                continue
+            if (enemy.wall.orientation == 'vertical') != vertical:
+                crossing.append(enemy)
+            elif abs((enemy._world_x if vertical else enemy._world_y) - line) < reach:
+                parallel.append(enemy)
+        crossing.sort(key=lambda enemy: enemy._world_y if vertical else enemy._world_x)
+        crossing_lines = [enemy._world_y if vertical else enemy._world_x for enemy in crossing]
+        path_enemies = (parallel, crossing_lines, crossing)
+        self._path_enemies = (nearby_enemies, line, path_enemies)
+        return path_enemies
+
     def move(self):
         if self.can_see_player():
             return
@@ -90,27 +165,34 @@ class Enemy(ScreenObject):
         nearby_walls = self._world.get_neighboring_objects(self.world_x, self.world_y, self._world.walls)
         nearby_enemies = self._world.get_neighboring_objects(self.world_x, self.world_y, self._world.enemies)
         
-        # Check collisions with nearby walls
-        for wall in nearby_walls:
+        # Check collisions with nearby walls, enemies only move along their patrol line
+        for wall in self.get_path_walls(nearby_walls):
             collision = wall.check_collision(*collision_rect)
             if collision:
                 break
         
-        # Check collisions with nearby enemies
+        # Check collisions with nearby enemies, the ones whose centers are
+        # further apart than their size plus truncation never collide
         if not collision:
-            for enemy in nearby_enemies:
-                if enemy == self:
-                    continue
-
-                collision = enemy.check_collision(*collision_rect)
+            next_x = self._world_x + dx
+            next_y = self._world_y + dy
+            reach_x = self.width + 2
+            reach_y = self.height + 2
+            parallel, crossing_lines, crossing = self.get_path_enemies(nearby_enemies)
+            along, reach = (next_y, reach_y) if self.wall.orientation == 'vertical' else (next_x, reach_x)
+            crossing = crossing[bisect.bisect_right(crossing_lines, along - reach):bisect.bisect_left(crossing_lines, along + reach)]
+            for enemy in (*parallel, *crossing):
+                collision = (abs(enemy._world_x - next_x) < reach_x and abs(enemy._world_y - next_y) < reach_y and
+                             enemy.check_collision(*collision_rect))
                 if collision:
                     break
 
         if collision:
             self.direction *= -1
+        elif dx:
+            self.world_x += dx
         else:
             self.world_y += dy
-            self.world_x += dx
 
         if self.wall.orientation == 'vertical':
             if self.world_y < self.wall.world_y or self.world_y - self.wall.world_y > self.wall.height:  # Patrol range
@@ -120,9 +202,10 @@ class Enemy(ScreenObject):
                 self.direction *= -1
 
     def _get_texture_rotation(self):
-        player: Player | None = self._world.player
+        # Enemies that see several players face the nearest one
+        player: Player | None = self._world.get_enemy_target(self)
 
-        if player and self.can_see_player():
+        if player:
             return 270 - math.degrees(math.atan2(self.world_y - player.world_y, self.world_x - player.world_x))
 
         if self.wall.orientation == 'vertical':
@@ -136,83 +219,53 @@ class Enemy(ScreenObject):
         if self.dead:
             self.dead_timer = max(0, self.dead_timer - dt)
             if self.dead_timer <= 0:
-                self._world.enemies.remove(self)
+                self._world.despawn(self)
 
             return
 
-        player: Player | None = self._world.player
-
         self.move()
-        
-        # Update existing bullets
-        for bullet in self.bullets[:]:
-            bullet.move()
-            if not bullet.active:
-                self.bullets.remove(bullet)
-            # Check if any enemy bullets hit the player
-            if bullet.check_hits_player() and player and player.invulnerable_timer <= 0:
-                player.take_damage()
-                bullet.active = False
-                if player and player.lives <= 0:
-                    self._world.end_game()                    
 
         # Shooting logic
         if self.shoot_delay > 0:
             self.shoot_delay = max(0, self.shoot_delay - dt)
-        elif player and self.can_see_player():
+        elif player := self._world.get_enemy_target(self):
             angle = self._get_texture_rotation()
             texture_x, texture_y = config.ENEMY_GUN_END
             texture_x = texture_x - self.texture_size / 2
             texture_y = texture_y - self.texture_size / 2
             bullet_start_x, bullet_start_y = geometry.rotate_point(texture_x, texture_y, angle)
-            self.bullets.append(Bullet(self._world, 
-                                    self.world_x + bullet_start_x, 
-                                    self.world_y + bullet_start_y, 
-                                    player.world_x, 
-                                    player.world_y))
+            self._world.projectiles.spawn(self.world_x + bullet_start_x, 
+                                          self.world_y + bullet_start_y, 
+                                          player.world_x, 
+                                          player.world_y,
+                                          TEAM_ENEMY, self._id)
             self.shoot_delay = config.ENEMY_SHOOT_DELAY
-            self.bullet_sound.play()
+            self._world.audio.play(config.BULLET_SOUND, self.world_x, self.world_y)
 
     def draw(self, screen: pygame.Surface):
-        player: Player | None = self._world.player
         screen_x, screen_y = self.get_screen_coordinates()
-        distance = math.sqrt((self.world_x - player.world_x)**2 + (self.world_y - player.world_y)**2) if player else 0
-        should_draw = (distance <= self.torch_radius or (player and player.night_vision_timer > 0)) and not self._world.is_game_over()
+        should_draw = self._world.is_lit_for_player(self.world_x, self.world_y, self.torch_radius)
 
         if self.dead:
-            if should_draw:
+            if should_draw and self.blood_surface:
                 screen.blit(self.blood_surface, (screen_x - self.blood_texture_size / 2, 
                                             screen_y - self.blood_texture_size / 2, self.blood_texture_size, self.blood_texture_size))
         
         else:
-            # Draw bullets
-            for bullet in self.bullets:
-                bullet.draw(screen)
-                
             # Draw enemy
-            texture_x, texture_y = config.ENEMY_TEXTURE_CENTER
-            texture_x = texture_x - self.texture_size / 2
-            texture_y = texture_y - self.texture_size / 2
-            angle = self._get_texture_rotation()
-            rotated_x, rotated_y = geometry.rotate_point(texture_x, texture_y, angle)
-            if should_draw:
-                enemy_surface = pygame.transform.rotate(self.surface, angle)
-                rotated_rect = enemy_surface.get_rect(
-                    center=(screen_x - rotated_x, screen_y - rotated_y)
-                )
-                
-                screen.blit(enemy_surface, rotated_rect.topleft)
+            if should_draw and self.surface:
+                enemy_surface, (blit_x, blit_y) = assets.get_rotation_frame(
+                    config.ENEMY_TEXTURE, (self.texture_size, self.texture_size),
+                    self._get_texture_rotation(), self.texture_pivot)
+                screen.blit(enemy_surface, (screen_x + blit_x, screen_y + blit_y))
 
         if config.DEBUG:
             pygame.draw.circle(screen, (0, 255, 0), (screen_x, screen_y), 2)
             pygame.draw.rect(screen, (0, 255, 0), self.get_screen_collision_rect(), 1)
 
-    def take_damage(self):
-        player: Player | None = self._world.player
-        distance = math.sqrt((self.world_x - player.world_x)**2 + (self.world_y - player.world_y)**2) if player else 0
-
-        self.hurt_sound.set_volume(max(1 - 0.5 * distance / self.torch_radius, 0))
-        self.hurt_sound.play()
+    def take_damage(self, killer: Player | None = None):
+        """Kill the enemy, the kill counts for killer if given"""
+        self._world.audio.play(config.ENEMY_HURT_SOUND, self.world_x, self.world_y)
         self.dead_timer = config.ENEMY_DEATH_TRACE_TIME
         self.dead = True
-        if player: player.kills += 1
+        if killer: killer.kills += 1
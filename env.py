@@ -0,0 +1,242 @@
+"""Training environments: a World behind a reset()/step() API.
+
+TorchDungeonEnv follows the Gymnasium conventions without depending on it:
+reset() returns (observation, info) and step(action) returns (observation,
+reward, terminated, truncated, info). VectorEnv steps K of them per call
+and stacks their observations.
+
+An action is (forward, rotation, shoot), the input main.py reads from the
+keys: forward in [-1, 1], rotation in [-1.5, 1.5] and shoot when above 0.5.
+With frame_skip the action is repeated for that many simulation steps and
+only the last one is observed. The reward is the kills gained minus the
+lives lost during the step.
+
+An observation is a dict of NumPy arrays:
+- 'grid': (4, OBS_GRID_SIZE, OBS_GRID_SIZE) uint8 occupancy of walls,
+  live enemies, bullets and bonuses around the player with world axes,
+  rasterized straight from the spatial grids and bullet arrays.
+- 'player': float32 lives, bullets, night vision, invulnerability, shot
+  readiness and the sine and cosine of the player's rotation.
+The arrays are reused by the next step, copy them to keep one.
+"""
+import math
+import numpy as np
+import config
+
+from world import World
+from player import Player
+from enemy import Enemy
+from wall import Wall
+from bonus import Bonus
+
+CHANNEL_WALLS = 0
+CHANNEL_ENEMIES = 1
+CHANNEL_BULLETS = 2
+CHANNEL_BONUSES = 3
+CHANNELS = 4
+PLAYER_FEATURES = 7
+MAX_ROTATION = 1.5  # Rotation input of a held arrow key
+
+
+class ObservationRasterizer:
+    """Writes observations of a world into preallocated arrays, without pygame.
+
+    The grid is aligned to cells of cell_size world units, so its origin
+    moves in whole cells with the player. Walls only change when chunks are
+    loaded or evicted: they are rasterized once into a bitmap of the 3x3
+    chunks around the player and every observation copies its window out of
+    it. The few enemies, bonuses and bullets are set cell by cell.
+    """
+
+    def __init__(self, world: World, grid_size: int = config.OBS_GRID_SIZE, cell_size: float = config.OBS_CELL_SIZE):
+        self._world = world
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self._walls_key = None
+        self._walls_bitmap = np.zeros((0, 0), dtype=np.uint8)
+        self._walls_origin = (0, 0)  # Cell of the bitmap's top-left corner
+
+    def _update_walls(self, chunk_x: float, chunk_y: float):
+        world = self._world
+        key = (chunk_x, chunk_y, world.walls, world.walls.version)
+        if key == self._walls_key:
+            return
+
+        cell_size = self.cell_size
+        chunk_cells = math.ceil(world.CHUNK_SIZE / cell_size)
+        origin_column = math.floor((chunk_x - 1) * world.CHUNK_SIZE / cell_size)
+        origin_row = math.floor((chunk_y - 1) * world.CHUNK_SIZE / cell_size)
+        # One spare cell on every side for the window of a player on the neighborhood's edge
+        bitmap = np.zeros((chunk_cells * 3 + 2, chunk_cells * 3 + 2), dtype=np.uint8)
+        center_x = (chunk_x + 0.5) * world.CHUNK_SIZE
+        center_y = (chunk_y + 0.5) * world.CHUNK_SIZE
+        for wall in world.get_neighboring_objects(center_x, center_y, world.walls):
+            left, top, width, height = wall.get_collision_rect()
+            x0 = max(math.floor(left / cell_size) - origin_column, 0)
+            y0 = max(math.floor(top / cell_size) - origin_row, 0)
+            x1 = math.ceil((left + width) / cell_size) - origin_column
+            y1 = math.ceil((top + height) / cell_size) - origin_row
+            bitmap[y0:y1, x0:x1] = 1
+
+        self._walls_bitmap = bitmap
+        self._walls_origin = (origin_column, origin_row)
+        self._walls_key = key
+
+    def rasterize(self, grid: np.ndarray, features: np.ndarray):
+        world = self._world
+        player = world.player
+        size = self.grid_size
+        cell_size = self.cell_size
+        column0 = math.floor(player.world_x / cell_size) - size // 2
+        row0 = math.floor(player.world_y / cell_size) - size // 2
+        grid.fill(0)
+
+        self._update_walls(*world.get_chunk_coords(player.world_x, player.world_y))
+        origin_column, origin_row = self._walls_origin
+        x = column0 - origin_column
+        y = row0 - origin_row
+        grid[CHANNEL_WALLS] = self._walls_bitmap[y:y + size, x:x + size]
+
+        for enemy in world.get_neighboring_objects(player.world_x, player.world_y, world.enemies):
+            column = math.floor(enemy._world_x / cell_size) - column0
+            row = math.floor(enemy._world_y / cell_size) - row0
+            if not enemy.dead and 0 <= column < size and 0 <= row < size:
+                grid[CHANNEL_ENEMIES, row, column] = 1
+
+        for bonus in world.get_neighboring_objects(player.world_x, player.world_y, world.bonuses):
+            column = math.floor(bonus._world_x / cell_size) - column0
+            row = math.floor(bonus._world_y / cell_size) - row0
+            if 0 <= column < size and 0 <= row < size:
+                grid[CHANNEL_BONUSES, row, column] = 1
+
+        store = world.projectiles
+        slots = np.flatnonzero(store.alive)
+        if len(slots):
+            columns = np.floor(store.x[slots] / cell_size).astype(int) - column0
+            rows = np.floor(store.y[slots] / cell_size).astype(int) - row0
+            inside = (columns >= 0) & (columns < size) & (rows >= 0) & (rows < size)
+            grid[CHANNEL_BULLETS, rows[inside], columns[inside]] = 1
+
+        rotation_rad = math.radians(player.rotation)
+        features[:] = (
+            player.lives / config.PLAYER_LIVES,
+            player.bullets_left / config.PLAYER_MAX_BULLETS,
+            player.night_vision_timer / config.GOOGLES_ACTIVE_TIME,
+            player.invulnerable_timer > 0,
+            player.shoot_delay <= 0,
+            math.sin(rotation_rad),
+            math.cos(rotation_rad),
+        )
+
+
+class TorchDungeonEnv:
+    """One headless World played through actions instead of the keyboard"""
+
+    def __init__(self, seed: int | None = None, max_ticks: int = config.ENV_MAX_TICKS,
+                 grid_size: int = config.OBS_GRID_SIZE, cell_size: float = config.OBS_CELL_SIZE,
+                 frame_skip: int = config.ENV_FRAME_SKIP):
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be at least 1, got {frame_skip}")
+
+        # Agents never look at the screen, textures and audio are not loaded
+        config.HEADLESS = True
+        self.world = World(Player, Enemy, Wall, Bonus)
+        self.world.dt = 1 / config.SIMULATION_RATE
+        self.seed = seed
+        self.max_ticks = max_ticks
+        self.frame_skip = frame_skip
+        self.grid_size = grid_size
+        self.rasterizer = ObservationRasterizer(self.world, grid_size, cell_size)
+        self.ticks = 0
+        self._kills = 0
+        self._lives = 0
+        self.grid = np.zeros((CHANNELS, grid_size, grid_size), dtype=np.uint8)
+        self.features = np.zeros(PLAYER_FEATURES, dtype=np.float32)
+
+    def observe(self, grid: np.ndarray | None = None, features: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """Current observation, written into the given arrays or the env's own"""
+        grid = self.grid if grid is None else grid
+        features = self.features if features is None else features
+        self.rasterizer.rasterize(grid, features)
+        return {'grid': grid, 'player': features}
+
+    def get_info(self) -> dict:
+        player = self.world.player
+        return {'ticks': self.ticks, 'kills': player.kills, 'lives': player.lives, 'seed': self.world.seed}
+
+    def reset(self, seed: int | None = None) -> tuple[dict[str, np.ndarray], dict]:
+        """Start a new game, on the given seed, the env's seed or a random one"""
+        self.world.start_game(seed if seed is not None else self.seed)
+        self.ticks = 0
+        self._kills = self.world.player.kills
+        self._lives = self.world.player.lives
+        return self.observe(), self.get_info()
+
+    def apply_action(self, action) -> tuple[float, bool, bool]:
+        """Advance frame_skip simulation steps, fewer if the game ends, returns (reward, terminated, truncated)"""
+        forward, rotation, shoot = action
+        forward = max(-1.0, min(1.0, float(forward)))
+        rotation = max(-MAX_ROTATION, min(MAX_ROTATION, float(rotation)))
+        world = self.world
+        for _ in range(self.frame_skip):
+            world.step(forward, rotation, shoot > 0.5)
+            self.ticks += 1
+            if world.is_game_over() or self.ticks >= self.max_ticks:
+                break
+
+        player = world.player
+        reward = (player.kills - self._kills) - (self._lives - player.lives)
+        self._kills = player.kills
+        self._lives = player.lives
+        return float(reward), world.is_game_over(), self.ticks >= self.max_ticks
+
+    def step(self, action) -> tuple[dict[str, np.ndarray], float, bool, bool, dict]:
+        reward, terminated, truncated = self.apply_action(action)
+        return self.observe(), reward, terminated, truncated, self.get_info()
+
+
+class VectorEnv:
+    """K environments stepped together, observations are stacked along a leading axis.
+
+    Environments whose game ended are reset right away, the observation
+    returned for them is the first one of the new game and their info
+    holds 'final_info' of the finished one.
+    """
+
+    def __init__(self, count: int, seed: int = 0, **env_options):
+        self.envs = [TorchDungeonEnv(seed + i, **env_options) for i in range(count)]
+        grid_size = self.envs[0].grid_size
+        self.grid = np.zeros((count, CHANNELS, grid_size, grid_size), dtype=np.uint8)
+        self.features = np.zeros((count, PLAYER_FEATURES), dtype=np.float32)
+        self.rewards = np.zeros(count, dtype=np.float32)
+        self.terminated = np.zeros(count, dtype=bool)
+        self.truncated = np.zeros(count, dtype=bool)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self) -> tuple[dict[str, np.ndarray], list[dict]]:
+        infos = []
+        for i, env in enumerate(self.envs):
+            env.reset()
+            env.observe(self.grid[i], self.features[i])
+            infos.append(env.get_info())
+        return {'grid': self.grid, 'player': self.features}, infos
+
+    def step(self, actions) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        """Step every env with its row of the (K, 3) actions"""
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, terminated, truncated = env.apply_action(action)
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            info = env.get_info()
+            if terminated or truncated:
+                # Every env keeps its seed sequence, game n of env i plays seed + n * K
+                env.seed += len(self.envs)
+                env.reset()
+                info = {**env.get_info(), 'final_info': info}
+            env.observe(self.grid[i], self.features[i])
+            infos.append(info)
+        return {'grid': self.grid, 'player': self.features}, self.rewards, self.terminated, self.truncated, infos
@@ -1,21 +1,61 @@
 import pygame, math
+import numpy as np
 
 def line_intersects_rect(x1: float, y1: float, x2: float, y2: float, rx: float, ry: float, rw: float, rh: float):
-        # Simple line-rectangle intersection check
-        left = rx
-        right = left + rw
-        top = ry
-        bottom = top + rh
-        
-        # Check if line is completely to one side of rectangle
-        if max(x1, x2) < left or min(x1, x2) > right:
-            return False
-        if max(y1, y2) < top or min(y1, y2) > bottom:
-            return False
-            
+        # Exact segment-rectangle intersection (Liang-Barsky clipping)
+        t_min = 0.0
+        t_max = 1.0
+
+        for start, delta, low, high in ((x1, x2 - x1, rx, rx + rw), (y1, y2 - y1, ry, ry + rh)):
+            if delta == 0:
+                # Parallel to this axis, the segment has to start inside the slab
+                if start < low or start > high:
+                    return False
+                continue
+
+            t1 = (low - start) / delta
+            t2 = (high - start) / delta
+            t_min = max(t_min, min(t1, t2))
+            t_max = min(t_max, max(t1, t2))
+            if t_min > t_max:
+                return False
+
         return True
 
 
+def segments_intersect_rects(x1, y1, x2, y2, rects: np.ndarray) -> np.ndarray:
+    """Vectorized line_intersects_rect for N segments against M (left, top, width, height) rects.
+
+    Segment coordinates are scalars or arrays of length N, the result is an
+    (N, M) boolean matrix.
+    """
+    x1 = np.asarray(x1, dtype=float).reshape(-1, 1)
+    y1 = np.asarray(y1, dtype=float).reshape(-1, 1)
+    x2 = np.asarray(x2, dtype=float).reshape(-1, 1)
+    y2 = np.asarray(y2, dtype=float).reshape(-1, 1)
+    left = rects[:, 0][None, :]
+    top = rects[:, 1][None, :]
+    right = left + rects[:, 2][None, :]
+    bottom = top + rects[:, 3][None, :]
+
+    shape = np.broadcast_shapes(x1.shape, x2.shape, left.shape)
+    t_min = np.zeros(shape)
+    t_max = np.ones(shape)
+
+    for start, delta, low, high in ((x1, x2 - x1, left, right), (y1, y2 - y1, top, bottom)):
+        parallel = delta == 0
+        safe_delta = np.where(parallel, 1.0, delta)
+        t1 = (low - start) / safe_delta
+        t2 = (high - start) / safe_delta
+        inside = (start >= low) & (start <= high)
+        near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+        far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+        t_min = np.maximum(t_min, near)
+        t_max = np.minimum(t_max, far)
+
+    return t_min <= t_max
+
+
 def rotate_point(x1: float, y1: float, angle_degrees: float):
     radians = math.radians(angle_degrees)
     cosine = math.cos(radians)
@@ -23,3 +63,17 @@ def rotate_point(x1: float, y1: float, angle_degrees: float):
     x_new = x1 * cosine + y1 * sine
     y_new = -x1 * sine + y1 * cosine
     return x_new, y_new
+
+
+def rects_collide(left: float, top: float, width: float, height: float,
+                  other_left: float, other_top: float, other_width: float, other_height: float) -> bool:
+    """pygame.Rect.colliderect of two (left, top, width, height) rects without building Rects.
+
+    pygame truncates float coordinates to integers, so do we, collisions
+    stay the same as with Rects.
+    """
+    left, top, width, height = int(left), int(top), int(width), int(height)
+    other_left, other_top, other_width, other_height = int(other_left), int(other_top), int(other_width), int(other_height)
+    return (width > 0 and height > 0 and other_width > 0 and other_height > 0 and
+            left < other_left + other_width and other_left < left + width and
+            top < other_top + other_height and other_top < top + height)
@@ -0,0 +1,80 @@
+from functools import lru_cache
+import pygame, config
+from asset_registry import assets
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> pygame.font.Font:
+    return pygame.font.Font(None, size)
+
+@lru_cache(maxsize=256)
+def render_text(text: str, size: int, color: tuple[int, int, int]) -> pygame.Surface:
+    """Rendered text, cached by content. The surface is shared, don't draw on it."""
+    return get_font(size).render(text, True, color)
+
+
+class Hud:
+    """Lives, rewards, bullets and night vision panel in the top-left corner.
+
+    The panel is rendered into its own surface and only redrawn when one of
+    the values it shows changes, every other frame it is a single blit.
+    """
+
+    def __init__(self):
+        self._panel: pygame.Surface | None = None
+        self._panel_state = None
+
+    def _get_state(self, player) -> tuple:
+        night_vision = int(player.night_vision_timer) if player.night_vision_timer > 0 else None
+        return player.lives, player.kills, player.bullets_left, night_vision
+
+    def _render_panel(self, state: tuple) -> pygame.Surface:
+        lives, kills, bullets_left, night_vision = state
+        heart_texture = assets.get_scaled(config.HEART_TEXTURE, (16, 16))
+
+        lines = [
+            (render_text("Lives:", 24, (255, 255, 255)), (10, 10)),
+            (render_text(f"Rewards: {kills * 10}$", 24, (255, 255, 0)), (10, 32)),
+            (render_text(f"Bullets: {bullets_left * 'I'}", 24, (0, 255, 255)), (10, 54)),
+        ]
+        if night_vision is not None:
+            lines.append((render_text(f"Night Vision: {night_vision}", 24, (0, 255, 0)), (10, 76)))
+
+        width = max(max(x + text.get_width() for text, (x, y) in lines), 72 + lives * 24)
+        height = max(y + text.get_height() for text, (x, y) in lines)
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        for text, position in lines:
+            panel.blit(text, position)
+        if heart_texture:
+            for i in range(lives):
+                panel.blit(heart_texture, (72 + i * 24, 10))
+        return panel
+
+    def update(self, world) -> list[pygame.Rect]:
+        """Redraw the panel if its values changed, returns the screen areas that changed"""
+        player = world.player
+        if not player:
+            return []
+
+        state = self._get_state(player)
+        if state == self._panel_state:
+            return []
+
+        changed = [self._panel.get_rect()] if self._panel else []
+        self._panel = self._render_panel(state)
+        self._panel_state = state
+        changed.append(self._panel.get_rect())
+        return changed
+
+    def draw(self, screen: pygame.Surface, world):
+        if not world.player:
+            return
+
+        self.update(world)
+        screen.blit(self._panel, (0, 0))
+
+        if world.is_game_over():
+            text = render_text('Game Over', 74, (255, 0, 0))
+            screen.blit(text, text.get_rect(center=(config.SCREEN_WIDTH / 2, config.SCREEN_HEIGHT / 2)))
+
+            text = render_text('Press R to restart', 36, (255, 255, 255))
+            screen.blit(text, text.get_rect(center=(config.SCREEN_WIDTH / 2, config.SCREEN_HEIGHT / 2 + 50)))
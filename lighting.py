@@ -0,0 +1,105 @@
+import random
+from functools import lru_cache
+import numpy as np
+import pygame, config
+
+@lru_cache(maxsize=None)
+def build_torch_mask(radius: int, falloff_radius: int) -> pygame.Surface:
+    """White SRCALPHA disc whose alpha fades out towards the edge.
+
+    Reproduces the concentric circles the torch used to be drawn with: a
+    pixel gets the alpha of the smallest whole circle containing it, for a
+    torch of falloff_radius stretched to radius. Masks are cached, so a
+    restarted game reuses them.
+    """
+    size = radius * 2
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((255, 255, 255, 0))
+
+    coordinates = np.arange(size) + 0.5 - radius
+    distance = np.hypot(coordinates[:, None], coordinates[None, :]) * falloff_radius / radius
+    circle = np.maximum(np.ceil(distance), 1)
+    alpha = np.where(circle <= falloff_radius, 255 * (1 - circle / falloff_radius), 0)
+
+    pixels = pygame.surfarray.pixels_alpha(surface)
+    pixels[...] = alpha.astype(np.uint8)
+    del pixels  # Unlocks the surface
+    return surface
+
+
+class TorchLighting:
+    """Darkness overlay with the flickering torch cut out of it.
+
+    The flicker radii are a small bank of masks built once. The darkness
+    buffer persists between frames and only the region the torch was in is
+    reset, instead of allocating and filling a full screen surface. With a
+    visibility polygon the mask is cut to it first, so walls cast shadows;
+    the polygon stencil is only redrawn when the polygon changes.
+    """
+
+    def __init__(self, radius: int = config.TORCH_RADIUS, flicker: int = config.TORCH_FLICKER):
+        self.radius = radius
+        self.flicker = flicker
+        self.masks = {mask_radius: build_torch_mask(mask_radius, radius)
+                      for mask_radius in range(radius - flicker, radius + flicker + 1)}
+        self.darkness = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.darkness.fill(config.COLOR_DARK)
+        self._fill_color = config.COLOR_DARK
+        self._lit_rect: pygame.Rect | None = None
+        size = (radius + flicker) * 2
+        self._light = pygame.Surface((size, size), pygame.SRCALPHA)
+        self._stencil = pygame.Surface((size, size), pygame.SRCALPHA)
+        self._stencil_polygon = None
+        # Flicker is cosmetic, keep it off the global random state
+        self._rng = random.Random()
+
+    def _fill(self, color: tuple[int, int, int, int]):
+        if self._fill_color != color:
+            self.darkness.fill(color)
+            self._fill_color = color
+            self._lit_rect = None
+        elif self._lit_rect:
+            self.darkness.fill(color, self._lit_rect)
+            self._lit_rect = None
+
+    def _update_stencil(self, polygon: np.ndarray):
+        if polygon is self._stencil_polygon:
+            return
+
+        center = self.radius + self.flicker
+        self._stencil.fill((0, 0, 0, 0))
+        if len(polygon) >= 3:
+            pygame.draw.polygon(self._stencil, (255, 255, 255, 255), (polygon + center).tolist())
+        self._stencil_polygon = polygon
+
+    def draw(self, screen: pygame.Surface, screen_x: float, screen_y: float, torch_on: bool = True,
+             night_vision: bool = False, polygon: np.ndarray | None = None, recompose: bool = True):
+        """Draw the darkness, polygon is the lit area as vertices relative to the torch.
+
+        Without recompose the darkness of the last call is drawn again, for
+        frames that are drawn clip rect by clip rect.
+        """
+        if recompose:
+            self._compose(screen_x, screen_y, torch_on, night_vision, polygon)
+        screen.blit(self.darkness, (0, 0))
+
+    def _compose(self, screen_x: float, screen_y: float, torch_on: bool, night_vision: bool, polygon: np.ndarray | None):
+        if night_vision:
+            self._fill(config.COLOR_NIGHT_VISION)
+        else:
+            self._fill(config.COLOR_DARK)
+            if torch_on:
+                current_radius = self._rng.randint(self.radius - self.flicker, self.radius + self.flicker)
+                mask = self.masks[current_radius]
+                if polygon is None:
+                    self._lit_rect = self.darkness.blit(mask, (int(screen_x - current_radius), int(screen_y - current_radius)),
+                                                        special_flags=pygame.BLEND_RGBA_SUB)
+                else:
+                    # Light = mask * stencil, then cut out of the darkness
+                    center = self.radius + self.flicker
+                    self._update_stencil(polygon)
+                    self._light.fill((0, 0, 0, 0))
+                    self._light.blit(mask, (center - current_radius, center - current_radius), special_flags=pygame.BLEND_RGBA_MAX)
+                    self._light.blit(self._stencil, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                    self._lit_rect = self.darkness.blit(self._light, (int(screen_x - center), int(screen_y - center)),
+                                                        special_flags=pygame.BLEND_RGBA_SUB)
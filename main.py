@@ -7,12 +7,26 @@ import config
 from player import Player
 from wall import Wall
 from enemy import Enemy
-import asyncio
+import asyncio, argparse, time
+from hud import Hud
+from dirty_rects import DirtyRectTracker
+from snapshot import save_world, load_world
+from replay import InputFrame, InputRecorder, InputReplayer, Recording
 
 from world import World
 
+parser = argparse.ArgumentParser(description="Torch Dungeon")
+parser.add_argument('--headless', action='store_true', help="run the simulation without display or audio")
+parser.add_argument('--ticks', type=int, default=10000, help="simulation steps to run in headless mode")
+parser.add_argument('--record', metavar='FILE', help="record the input of the session to FILE")
+parser.add_argument('--replay', metavar='FILE', help="play back a session recorded with --record and check it stays in sync")
+args, _ = parser.parse_known_args()
+if args.headless:
+    config.HEADLESS = True
+
 # Initialize Pygame
-pygame.init()
+if not config.HEADLESS:
+    pygame.init()
 
 # Colors
 BLACK = (0, 0, 0)
@@ -20,31 +34,18 @@ GRAY = (128, 128, 128)
 STONE_GRAY = (100, 100, 100)
 WALL_BROWN = (139, 69, 19)
 
-def draw_panel(screen: pygame.Surface, world: World):
-    if not world.player:
-        return
-
-    # Draw lives
-    font = pygame.font.Font(None, 24)
-    label = font.render("Lives:", True, (255, 255, 255))
-    heart_texture = pygame.image.load(config.HEART_TEXTURE)
-    heart_texture = pygame.transform.scale(heart_texture, (16, 16))
-    screen.blit(label, (10, 10))
-    for i in range(world.player.lives):
-        screen.blit(heart_texture, (72 + i * 24, 10))
-
-    # Draw kills
-    kills_text = font.render(f"Rewards: {world.player.kills * 10}$", True, (255, 255, 0))
-    screen.blit(kills_text, (10, 32))
+def draw_frame(screen: pygame.Surface, world: World, hud: Hud, redraw: bool = False):
+    # The world's static layer covers the whole screen
+    world.draw(screen, redraw)
 
-    # Draw bullets
-    bullets_text = font.render(f"Bullets: {world.player.bullets_left * 'I'}", True, (0, 255, 255))
-    screen.blit(bullets_text, (10, 54))
+    # Draw UI
+    profiler = world.profiler
+    started = profiler.start()
+    hud.draw(screen, world)
 
-    # Draw night vision
-    if world.player.night_vision_timer > 0:
-        night_vision_text = font.render(f"Night Vision: {int(world.player.night_vision_timer)}", True, (0, 255, 0))
-        screen.blit(night_vision_text, (10, 76))
+    if config.DEBUG:
+        profiler.draw(screen)
+    profiler.stop('hud', started)
 
 async def main():
     world = World(Player, Enemy, Wall, Bonus)
@@ -56,34 +57,41 @@ async def main():
     screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), flags)
     pygame.display.set_caption("Torch Dungeon")
     clock = pygame.time.Clock()
-
-    # Load floor texture
-    try:
-        floor_texture = pygame.image.load(config.FLOOR_TEXTURE)
-        # Scale the texture to screen size but make it larger for scrolling
-        floor_texture = pygame.transform.scale(floor_texture, (config.SCREEN_WIDTH * 0.5, config.SCREEN_HEIGHT * 0.5))
-        
-    except pygame.error:
-        print("Could not load floor texture. Using default color.")
-        floor_texture = None
+    hud = Hud()
+    dirty_tracker = DirtyRectTracker()
+    step_dt = 1 / config.SIMULATION_RATE
+    recorder = InputRecorder(world, args.record, step_dt) if args.record else None
+    replayer = InputReplayer(world, Recording.load(args.replay)) if args.replay else None
 
     # Start the game
-    world.start_game()
+    if replayer:
+        replayer.start_game()
+    else:
+        world.start_game()
+        if recorder:
+            recorder.start_game()
 
     running = True
+    accumulator = 0.0
     prev_time = pygame.time.get_ticks()
     while running:
-        # Calculate delta time in seconds
+        world.profiler.begin_frame()
+
+        # Accumulate real time and consume it in fixed simulation steps
         current_time = pygame.time.get_ticks()
-        world.dt = (current_time - prev_time) / 1000.0  # Convert to seconds
+        accumulator += (current_time - prev_time) / 1000.0  # Convert to seconds
         prev_time = current_time
 
+        restart = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED):
+                # The window contents may be lost, redraw all of it
+                dirty_tracker.reset()
             elif event.type == pygame.KEYDOWN:
                 if event.scancode == 21 and world.is_game_over():  # Press R to restart (scancode 21 is 'R' key)
-                    world.start_game()
+                    restart = True
 
                 if event.key == pygame.K_ESCAPE:
                     running = False
@@ -91,70 +99,137 @@ async def main():
                 if event.key == pygame.K_F3:
                     config.DEBUG = not config.DEBUG
 
-        if not world.is_game_over():
+                if event.key == pygame.K_F5:
+                    config.DIRTY_RECT_RENDERING = not config.DIRTY_RECT_RENDERING
+                    dirty_tracker.reset()
+
+                if event.key == pygame.K_F6:
+                    save_world(world)
+                    print(f"World saved to {config.SNAPSHOT_FILE}")
+
+                if event.key == pygame.K_F7:
+                    try:
+                        load_world(world)
+                        dirty_tracker.reset()
+                    except (OSError, ValueError) as error:
+                        print(f"Could not load {config.SNAPSHOT_FILE}: {error}")
+
+                if event.key == pygame.K_F4 and not world.profiler.is_recording():
+                    world.profiler.start_recording(with_cprofile=bool(event.mod & pygame.KMOD_SHIFT))
+
+        if replayer:
+            # Recorded frames bring their own input and step count
+            if replayer.is_finished():
+                break
+            replayer.play_frame()
+            world.render_alpha = 1.0
+        else:
+            if restart:
+                world.start_game()
+                if recorder:
+                    recorder.start_game()
+
             # Player movement
             keys = pygame.key.get_pressed()
             forward = 0
             rotation = 0
-            
+
             # Forward/backward movement
             if keys[pygame.K_w] or keys[pygame.K_UP]: forward += 1
             if keys[pygame.K_s] or keys[pygame.K_DOWN]: forward -= 1
-            
+
             # Rotation
             if keys[pygame.K_a] or keys[pygame.K_LEFT]: rotation -= 1.5
             if keys[pygame.K_d] or keys[pygame.K_RIGHT]: rotation += 1.5
 
-            if world.player:
-                world.player.move(forward)
-                world.player.rotate(rotation)
-                
-                # Shooting
-                if keys[pygame.K_SPACE]:
-                    world.player.shoot()
-
-        # Draw everything
-        screen.fill((0, 0, 0))
-        
-        # Draw floor texture
-        if floor_texture:
-            # Calculate floor texture position based on world offset
-            texture_x = (world.offset_x % floor_texture.get_width()) - floor_texture.get_width()
-            texture_y = (world.offset_y % floor_texture.get_height()) - floor_texture.get_height()
-            
-            # Draw floor tiles
-            for y in range(-1, config.SCREEN_HEIGHT // floor_texture.get_height() + 2):
-                for x in range(-1, config.SCREEN_WIDTH // floor_texture.get_width() + 2):
-                    screen.blit(floor_texture, 
-                              (texture_x + x * floor_texture.get_width(),
-                               texture_y + y * floor_texture.get_height()))
-        else:
-            screen.fill(STONE_GRAY)
-
-        world.draw(screen)
-        
-        # Draw UI
-        if world.player:
-            draw_panel(screen, world)
-
-        if world.is_game_over():
-            font = pygame.font.Font(None, 74)
-            text = font.render('Game Over', True, (255, 0, 0))
-            text_rect = text.get_rect(center=(config.SCREEN_WIDTH/2, config.SCREEN_HEIGHT/2))
-            screen.blit(text, text_rect)
-            
-            font = pygame.font.Font(None, 36)
-            text = font.render('Press R to restart', True, (255, 255, 255))
-            text_rect = text.get_rect(center=(config.SCREEN_WIDTH/2, config.SCREEN_HEIGHT/2 + 50))
-            screen.blit(text, text_rect)
-
-        pygame.display.flip()
-        clock.tick(config.FRAMERATE)
+            steps = 0
+            world.dt = step_dt
+            while accumulator >= step_dt and steps < config.MAX_SIMULATION_STEPS:
+                world.step(forward, rotation, keys[pygame.K_SPACE])
+                if recorder:
+                    recorder.record_step()
+                accumulator -= step_dt
+                steps += 1
+
+            # Drop the backlog instead of spiralling when the machine can't keep up
+            if steps == config.MAX_SIMULATION_STEPS:
+                accumulator = min(accumulator, step_dt)
+
+            world.render_alpha = accumulator / step_dt
+            if recorder:
+                recorder.record_frame(InputFrame(steps, forward, rotation, keys[pygame.K_SPACE], restart))
+
+        # Draw everything, or only the areas that changed
+        profiler = world.profiler
+        dirty_rects = dirty_tracker.get_dirty_rects(world, hud) if config.DIRTY_RECT_RENDERING else None
+        if dirty_rects is None:
+            draw_frame(screen, world, hud)
+        elif dirty_rects:
+            # Every dirty rect is redrawn clipped to itself, the pixels between them are left alone
+            for i, rect in enumerate(dirty_rects):
+                screen.set_clip(rect)
+                draw_frame(screen, world, hud, redraw=i > 0)
+            screen.set_clip(None)
+
+        started = profiler.start()
+        if dirty_rects is None:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+        profiler.stop('flip', started)
+        profiler.end_frame()
 
-        world.update()
+        clock.tick(config.FRAMERATE)
 
         await asyncio.sleep(0)
 
+    if recorder:
+        recorder.save()
+        print(f"Recorded {len(recorder.recording.frames)} frames to {recorder.path}")
+    if replayer:
+        report_replay(replayer)
+
+    world.chunk_loader.shutdown()
     pygame.quit()
 
-asyncio.run(main())
+def run_headless(max_ticks: int):
+    """Step the simulation as fast as possible with an idle player"""
+    world = World(Player, Enemy, Wall, Bonus)
+    world.dt = 1 / config.SIMULATION_RATE
+    world.start_game()
+
+    ticks = 0
+    start_time = time.perf_counter()
+    while ticks < max_ticks and not world.is_game_over():
+        world.step()
+        ticks += 1
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Simulated {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+
+def report_replay(replayer: InputReplayer):
+    if replayer.mismatch is None:
+        print(f"Replay in sync for {replayer.steps} steps")
+    else:
+        print(f"Replay diverged from the recording at step {replayer.mismatch}")
+
+def run_replay_headless(path: str):
+    """Play a recording back as fast as possible"""
+    world = World(Player, Enemy, Wall, Bonus)
+    replayer = InputReplayer(world, Recording.load(path))
+    replayer.start_game()
+
+    start_time = time.perf_counter()
+    while not replayer.is_finished():
+        replayer.play_frame()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Simulated {replayer.steps} ticks in {elapsed:.2f}s ({replayer.steps / max(elapsed, 1e-9):.0f} ticks/s)")
+    report_replay(replayer)
+
+if config.HEADLESS and args.replay:
+    run_replay_headless(args.replay)
+elif config.HEADLESS:
+    run_headless(args.ticks)
+else:
+    asyncio.run(main())
@@ -1,14 +1,22 @@
-import pygame, math, random, config, geometry
+import pygame, math, config, geometry
 from world import World
 from screen_object import ScreenObject
 from bullet import Bullet
+from projectiles import TEAM_PLAYER
 from bonus import Bonus
+from asset_registry import assets
+from lighting import TorchLighting
+from hud import render_text
 
 class Player(ScreenObject):
+    __slots__ = ('rotation', 'rotation_speed', 'lives', 'kills', 'bullets_left', 'shoot_delay', 'invulnerable_timer',
+                 'night_vision_timer', 'recharge_timer', 'recharge_accumulator', 'torch_radius', 'texture_size',
+                 'player_size', 'surface', 'texture_pivot', 'lighting', 'debug')
+
     def __init__(self, world: World, world_x: float, world_y: float):
         super().__init__(world, world_x, world_y, config.PLAYER_SIZE, config.PLAYER_SIZE)
 
-        self.torch_surface = None
+        self.lighting = None
         self.torch_radius = config.TORCH_RADIUS
         self.texture_size = config.PLAYER_TEXTURE_SIZE
         self.player_size = config.PLAYER_TEXTURE_SIZE
@@ -16,7 +24,6 @@ class Player(ScreenObject):
         self.invulnerable_timer = 0
         self.rotation = 0  # Current rotation angle in degrees
         self.rotation_speed = config.PLAYER_ROTATION_SPEED
-        self.bullets = []
         self.bullets_left = config.PLAYER_MAX_BULLETS
         self.kills = 0
 
@@ -26,26 +33,15 @@ class Player(ScreenObject):
         self.invulnerable_timer = 0
         self.recharge_accumulator = 0
 
-        self.bullet_sound = pygame.mixer.Sound(config.BULLET_SOUND)
-        self.recharge_sound = pygame.mixer.Sound(config.PLAYER_BULLET_RECHARGE_SOUND)
-        self.recharge_sound.set_volume(0.5)
-        self.player_hurt_sound = pygame.mixer.Sound(config.PLAYER_HURT_SOUND)
-
         self.debug = {}
 
-        try:
-            self.surface = pygame.image.load(config.PLAYER_TEXTURE).convert_alpha()
-            self.surface = pygame.transform.scale(self.surface, (self.texture_size, self.texture_size))
-        except pygame.error:
-            print("Could not load player texture")
-            self.surface = None
+        self.surface = assets.get_scaled(config.PLAYER_TEXTURE, (self.texture_size, self.texture_size))
+        texture_x, texture_y = config.PLAYER_TEXTURE_CENTER
+        self.texture_pivot = (texture_x - self.texture_size / 2, texture_y - self.texture_size / 2)
 
-        # Create torch light surface
-        self.torch_surface = pygame.Surface((self.torch_radius * 2, self.torch_radius * 2), pygame.SRCALPHA)
-        for radius in range(self.torch_radius, 0, -1):
-            alpha = int(255 * (1 - radius / self.torch_radius))
-            color = (255, 255, 255, alpha)
-            pygame.draw.circle(self.torch_surface, color, (self.torch_radius, self.torch_radius), int(radius))
+        # Create torch lighting
+        if not config.HEADLESS:
+            self.lighting = TorchLighting(self.torch_radius)
 
     def shoot(self):
         if self.shoot_delay > 0 or self.bullets_left <= 0:
@@ -64,17 +60,21 @@ class Player(ScreenObject):
         target_y = self.world_y + bullet_start_y + math.cos(rotation_rad) * 100
 
         # Create bullet
-        self.bullets.append(Bullet(self._world, 
-                                 self.world_x + bullet_start_x, 
-                                 self.world_y + bullet_start_y, 
-                                 target_x, target_y, 
-                                 color=config.PLAYER_BULLET_COLOR,
-                                 is_enemy=False))
+        self._world.projectiles.spawn(self.world_x + bullet_start_x, 
+                                      self.world_y + bullet_start_y, 
+                                      target_x, target_y, 
+                                      TEAM_PLAYER, self._id,
+                                      color=config.PLAYER_BULLET_COLOR)
         self.shoot_delay = config.PLAYER_SHOOT_DELAY
         self.bullets_left -= 1
         
         # Play sound
-        self.bullet_sound.play()
+        self._world.audio.play(config.BULLET_SOUND)
+
+    @property
+    def bullets(self) -> list[Bullet]:
+        """Views of the bullets this player fired that are still flying"""
+        return self._world.projectiles.get_bullets(self._id)
 
     def move(self, forward: float):
         # Convert rotation to radians for math calculations
@@ -87,7 +87,10 @@ class Player(ScreenObject):
         nearby_enemies = self._world.get_neighboring_objects(self.world_x, self.world_y, self._world.enemies)
         nearby_walls = self._world.get_neighboring_objects(self.world_x, self.world_y, self._world.walls)
         enemies = list(filter(lambda enemy: not enemy.dead, nearby_enemies))
-        collidable_objects: list[ScreenObject] = [*nearby_walls, *enemies]
+        # Only objects near the rect swept by the move can collide with any of the three rects below
+        swept_rect = self.get_collision_rect(min(dx, 0), min(dy, 0))
+        swept_rect = (swept_rect[0], swept_rect[1], swept_rect[2] + abs(dx), swept_rect[3] + abs(dy))
+        collidable_objects: list[ScreenObject] = [obj for obj in (*nearby_walls, *enemies) if obj.is_near(*swept_rect)]
 
         # Check collisions with adjusted wall positions
         collision = False
@@ -128,7 +131,9 @@ class Player(ScreenObject):
         if dx != 0 or dy != 0:
             self.world_x += dx
             self.world_y += dy
-            self._world.offset(dx, dy)
+            # The camera follows one player only
+            if self is self._world.player:
+                self._world.offset(dx, dy)
 
         if config.DEBUG:
             self.debug['collision_hits'] = hits
@@ -143,7 +148,7 @@ class Player(ScreenObject):
         if self.invulnerable_timer <= 0:
             self.lives -= 1
             self.invulnerable_timer = config.PLAYER_INVULNERABILITY_TIME
-            self.player_hurt_sound.play()
+            self._world.audio.play(config.PLAYER_HURT_SOUND)
 
     def start_night_vision(self):
         self.night_vision_timer = config.GOOGLES_ACTIVE_TIME
@@ -154,26 +159,6 @@ class Player(ScreenObject):
     def update(self):
         dt = self._world.dt  # Get time delta in seconds
 
-        # Update bullets
-        for bullet in self.bullets[:]:
-            bullet.move()
-            if not bullet.active:
-                self.bullets.remove(bullet)
-                continue
-            
-            # Check if bullet hits any enemies
-            hits = bullet.check_hits_enemies()
-            if hits:
-                bullet.active = False
-                self.bullets.remove(bullet)
-                # Remove hit enemies
-                for enemy in hits:
-                    if enemy in self._world.enemies:
-                        enemy.take_damage()
-                        # Chance to spawn bonus
-                        if random.random() < config.BONUS_SPAWN_CHANCE:
-                            self._world.bonuses.append(Bonus(self._world, enemy.world_x, enemy.world_y))
-
         if self._world.is_game_over():
             return
 
@@ -193,61 +178,43 @@ class Player(ScreenObject):
             if self.recharge_accumulator >= config.PLAYER_BULLET_RECHARGE_TIME:
                 self.recharge_accumulator -= config.PLAYER_BULLET_RECHARGE_TIME
                 self.bullets_left += 1
-                self.recharge_sound.play()
+                self._world.audio.play(config.PLAYER_BULLET_RECHARGE_SOUND, volume=0.5)
 
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, redraw: bool = False):
+        """Draw the player and its torch, redraw repeats the frame's last draw into another clip rect"""
         if not self.surface:
             return
             
-        # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw(screen)
-            
         screen_x, screen_y = self.get_screen_coordinates()
-        texture_x, texture_y = config.PLAYER_TEXTURE_CENTER
-        texture_x = texture_x - self.texture_size / 2
-        texture_y = texture_y - self.texture_size / 2
         blink_factor = self.invulnerable_timer * 5 / config.PLAYER_INVULNERABILITY_TIME
         should_blink = blink_factor - math.floor(blink_factor) < 0.5
 
         if (self.invulnerable_timer <= 0 or should_blink) and not self._world.is_game_over():
-            texture_x, texture_y = config.ENEMY_TEXTURE_CENTER
-            texture_x = texture_x - self.texture_size / 2
-            texture_y = texture_y - self.texture_size / 2
-            rotated_x, rotated_y = geometry.rotate_point(texture_x, texture_y, self.rotation)
-            player_surface = pygame.transform.rotate(self.surface, self.rotation)
-            rotated_rect = player_surface.get_rect(
-                center=(screen_x - rotated_x, screen_y - rotated_y)
-            )
-            screen.blit(player_surface, rotated_rect.topleft)
+            player_surface, (blit_x, blit_y) = assets.get_rotation_frame(
+                config.PLAYER_TEXTURE, (self.texture_size, self.texture_size), self.rotation, self.texture_pivot)
+            screen.blit(player_surface, (screen_x + blit_x, screen_y + blit_y))
     
         # Create torch light effect
-        light_surface = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.SRCALPHA)
-        light_surface.fill(config.COLOR_DARK)
-        
-        # Apply the main torch light
-        if not self._world.is_game_over():
-            if self.torch_surface != None and self.night_vision_timer <= 0:
-                current_torch_radius = random.randint(config.TORCH_RADIUS - 5, config.TORCH_RADIUS + 5)
-                scaled_torch = pygame.transform.scale(self.torch_surface, (current_torch_radius * 2, current_torch_radius * 2))
-                light_surface.blit(scaled_torch, 
-                        (int(screen_x - current_torch_radius), 
-                        int(screen_y - current_torch_radius)), 
-                        special_flags=pygame.BLEND_RGBA_SUB)
-
-            if self.night_vision_timer > 0:
-                light_surface.fill(config.COLOR_NIGHT_VISION)
-
-        screen.blit(light_surface, (0, 0))
+        started = self._world.profiler.start()
+        if self.lighting:
+            game_over = self._world.is_game_over()
+            night_vision = self.night_vision_timer > 0 and not game_over
+            # Walls cast shadows, the polygon is cached while the player stands still
+            polygon = self._world.torch_visibility.update() if not game_over and not night_vision else None
+            self.lighting.draw(screen, screen_x, screen_y,
+                               torch_on=not game_over,
+                               night_vision=night_vision,
+                               polygon=polygon,
+                               recompose=not redraw)
+        self._world.profiler.stop('lighting', started)
 
         if config.DEBUG:
             pygame.draw.circle(screen, (0, 255, 0), (screen_x, screen_y), 2)
             pygame.draw.rect(screen, (0, 255, 0), self.get_screen_collision_rect(), 1)
-            font = pygame.font.Font(None, 18)
             if 'collision_hits' in self.debug:
                 hits = self.debug['collision_hits']
-                text = font.render(f"Collision debug: {hits}", True, (255, 255, 255))
+                text = render_text(f"Collision debug: {hits}", 18, (255, 255, 255))
                 screen.blit(text, (4, config.SCREEN_HEIGHT - 20))
             
-            text = font.render(f"Player position: {(round(self.world_x, 2), round(self.world_y, 2))}", True, (255, 255, 255))
+            text = render_text(f"Player position: {(round(self.world_x, 2), round(self.world_y, 2))}", 18, (255, 255, 255))
             screen.blit(text, (4, config.SCREEN_HEIGHT - 40))            
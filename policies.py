@@ -0,0 +1,86 @@
+"""Scripted players that drive a World in place of the keyboard.
+
+A policy picks (forward, rotation, shoot) every simulation step, the same
+input main.py reads from the keys. Policies are looked up by name in
+POLICIES or imported from a "module:Class" spec, so worker processes can
+create them from a string.
+"""
+import importlib, math, random
+import config
+
+MAX_ROTATION = 1.5  # Rotation input of a held arrow key
+
+
+class Policy:
+    """Decides the player's input every step, subclasses override act"""
+    name = ''
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+
+    def reset(self, world):
+        """Called once the world's game has started"""
+        pass
+
+    def act(self, world) -> tuple[float, float, bool]:
+        return 0, 0, False
+
+
+class IdlePolicy(Policy):
+    name = 'idle'
+
+
+class RandomPolicy(Policy):
+    """Holds a random input for a random number of steps"""
+    name = 'random'
+
+    def reset(self, world):
+        self._action = (0, 0, False)
+        self._steps_left = 0
+
+    def act(self, world) -> tuple[float, float, bool]:
+        if self._steps_left <= 0:
+            rng = self.rng
+            self._action = (rng.choice((1, 1, 0, -1)), rng.choice((0, 0, MAX_ROTATION, -MAX_ROTATION)), rng.random() < 0.3)
+            self._steps_left = rng.randint(5, 60)
+        self._steps_left -= 1
+        return self._action
+
+
+class HunterPolicy(RandomPolicy):
+    """Turns towards the nearest live enemy in torch range and sight and shoots it, wanders otherwise"""
+    name = 'hunter'
+
+    def act(self, world) -> tuple[float, float, bool]:
+        player = world.player
+        nearest = None
+        nearest_distance = config.TORCH_RADIUS
+        for enemy in world.get_neighboring_objects(player.world_x, player.world_y, world.enemies):
+            distance = math.hypot(enemy.world_x - player.world_x, enemy.world_y - player.world_y)
+            # Enemies behind walls would only soak up bullets
+            if not enemy.dead and distance < nearest_distance and world.can_enemy_see_player(enemy):
+                nearest, nearest_distance = enemy, distance
+
+        if nearest is None:
+            return super().act(world)
+
+        # The player moves along (sin, cos) of its rotation and rotate() turns the other way
+        target = math.degrees(math.atan2(nearest.world_x - player.world_x, nearest.world_y - player.world_y))
+        difference = (target - player.rotation + 180) % 360 - 180
+        max_turn = MAX_ROTATION * player.rotation_speed * world.dt
+        rotation = -max(-MAX_ROTATION, min(MAX_ROTATION, difference / max_turn * MAX_ROTATION))
+        return 0, rotation, abs(difference) < 10
+
+
+POLICIES: dict[str, type[Policy]] = {policy.name: policy for policy in (IdlePolicy, RandomPolicy, HunterPolicy)}
+
+
+def get_policy(spec: str) -> type[Policy]:
+    """Policy class by name, or imported from "module:Class\""""
+    if spec in POLICIES:
+        return POLICIES[spec]
+    if ':' not in spec:
+        raise ValueError(f"Unknown policy {spec!r}, expected one of {', '.join(POLICIES)} or module:Class")
+
+    module_name, class_name = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,36 @@
+import config
+
+class ObjectPool:
+    """Free list of released objects, so short-lived entities are reused instead of reallocated.
+
+    acquire() takes the factory's arguments. It hands out a released object
+    after calling its reset() with them, or creates a new one when the pool
+    is empty. Released objects must no longer be referenced by the world.
+    """
+
+    def __init__(self, factory, max_size: int = config.POOL_MAX_SIZE):
+        self._factory = factory
+        self._free = []
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        if self._free:
+            obj = self._free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+            return obj
+
+        self.created += 1
+        return self._factory(*args, **kwargs)
+
+    def release(self, obj):
+        if len(self._free) < self.max_size:
+            self._free.append(obj)
+
+    def clear(self):
+        self._free.clear()
+
+    def __len__(self):
+        return len(self._free)
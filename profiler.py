@@ -0,0 +1,156 @@
+from collections import deque
+import cProfile, json, time
+import pygame, config
+
+SECTIONS: tuple[str, ...] = (
+    'visibility',
+    'player_update',
+    'enemy_update',
+    'bonus_update',
+    'projectile_update',
+    'chunks',
+    'floor',
+    'wall_draw',
+    'enemy_draw',
+    'bonus_draw',
+    'projectile_draw',
+    'lighting',
+    'hud',
+    'flip',
+)
+
+SECTION_COLORS: dict[str, tuple[int, int, int]] = {
+    'visibility': (255, 128, 0),
+    'player_update': (0, 200, 255),
+    'enemy_update': (255, 80, 80),
+    'bonus_update': (255, 160, 200),
+    'projectile_update': (0, 255, 255),
+    'chunks': (255, 200, 0),
+    'floor': (120, 120, 120),
+    'wall_draw': (180, 110, 60),
+    'enemy_draw': (200, 40, 40),
+    'bonus_draw': (200, 100, 160),
+    'projectile_draw': (0, 160, 160),
+    'lighting': (255, 255, 160),
+    'hud': (80, 255, 80),
+    'flip': (160, 160, 255),
+}
+
+class FrameProfiler:
+    """Per-subsystem frame timings for the debug overlay and recordings.
+
+    Timed code calls start() and stop(section, started) around the existing
+    calls, which costs two perf_counter reads and a dict update.
+    """
+
+    def __init__(self, history: int = config.PROFILER_HISTORY):
+        self.history: deque[dict[str, float]] = deque(maxlen=history)
+        self.current: dict[str, float] = dict.fromkeys(SECTIONS, 0.0)
+        self._frame_start = time.perf_counter()
+        self._recording: list[dict[str, float]] | None = None
+        self._record_frames = 0
+        self._record_path = ''
+        self._cprofile: cProfile.Profile | None = None
+        self._font = None
+
+    @staticmethod
+    def start() -> float:
+        return time.perf_counter()
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+
+    def stop(self, section: str, started: float):
+        self.current[section] += time.perf_counter() - started
+
+    def end_frame(self):
+        timings = self.current
+        timings['total'] = time.perf_counter() - self._frame_start
+        self.history.append(timings)
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+
+        if self._recording is not None:
+            self._recording.append(timings)
+            if len(self._recording) >= self._record_frames:
+                self._finish_recording()
+
+    def is_recording(self) -> bool:
+        return self._recording is not None
+
+    def start_recording(self, frames: int = config.PROFILER_RECORD_FRAMES, with_cprofile: bool = False) -> str:
+        """Record the next frames to a JSON file, optionally with a cProfile capture next to it"""
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self._record_path = f"profile-{stamp}"
+        self._recording = []
+        self._record_frames = frames
+        if with_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self._record_path
+
+    def _finish_recording(self):
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(f"{self._record_path}.prof")
+            self._cprofile = None
+
+        with open(f"{self._record_path}.json", 'w') as output:
+            json.dump({
+                'sections': list(SECTIONS),
+                'budget_ms': 1000 / config.FRAMERATE,
+                'frames': [{name: round(value * 1000, 4) for name, value in frame.items()} for frame in self._recording],
+            }, output)
+
+        print(f"Profile recorded to {self._record_path}.json")
+        self._recording = None
+
+    def draw(self, screen: pygame.Surface):
+        """Stacked frame-time graph of the recent frames with a per-section legend"""
+        if not self.history:
+            return
+
+        if self._font is None:
+            self._font = pygame.font.Font(None, 16)
+
+        budget = 1000 / config.FRAMERATE
+        scale = 2  # Pixels per millisecond
+        graph_height = int(budget * 2 * scale)
+        graph_width = self.history.maxlen
+        left = config.SCREEN_WIDTH - graph_width - 10
+        top = 10
+
+        background = pygame.Surface((graph_width, graph_height), pygame.SRCALPHA)
+        background.fill((0, 0, 0, 160))
+        screen.blit(background, (left, top))
+
+        bottom = top + graph_height
+        for index, frame in enumerate(self.history):
+            y = bottom
+            for section in SECTIONS:
+                height = frame[section] * 1000 * scale
+                if height < 0.5:
+                    continue
+                new_y = max(top, y - height)
+                pygame.draw.line(screen, SECTION_COLORS[section], (left + index, y), (left + index, new_y))
+                y = new_y
+            # Untracked time on top, so the bar reaches the full frame time
+            total_y = max(top, bottom - frame['total'] * 1000 * scale)
+            if total_y < y:
+                pygame.draw.line(screen, (90, 90, 90), (left + index, y), (left + index, total_y))
+
+        budget_y = bottom - budget * scale
+        pygame.draw.line(screen, (255, 255, 255), (left, budget_y), (left + graph_width, budget_y))
+
+        # Legend with the averages over the history
+        frames = len(self.history)
+        y = bottom + 4
+        for section in (*SECTIONS, 'total'):
+            average = sum(frame[section] for frame in self.history) / frames * 1000
+            color = SECTION_COLORS.get(section, (255, 255, 255))
+            text = self._font.render(f"{section}: {average:.2f} ms", True, color)
+            screen.blit(text, (left, y))
+            y += 12
+
+        if self._recording is not None:
+            text = self._font.render(f"REC {len(self._recording)}/{self._record_frames}", True, (255, 0, 0))
+            screen.blit(text, (left, y))
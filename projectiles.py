@@ -0,0 +1,274 @@
+import math
+import numpy as np
+import pygame, config
+
+TEAM_PLAYER = 0
+TEAM_ENEMY = 1
+
+ARRAY_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'team', 'owner', 'alive', 'generation', 'color')
+
+
+def rects_overlap(x: np.ndarray, y: np.ndarray, width: float, height: float, rects: np.ndarray) -> np.ndarray:
+    """(N, M) matrix telling which of N equally sized rects overlap which of M (left, top, width, height) rects.
+
+    Coordinates are truncated to integers like geometry.rects_collide does,
+    bullets hit what pygame.Rect.colliderect would.
+    """
+    x = np.trunc(x)
+    y = np.trunc(y)
+    width = int(width)
+    height = int(height)
+    if width <= 0 or height <= 0:
+        return np.zeros((len(x), len(rects)), dtype=bool)
+
+    rects = np.trunc(rects)
+    left = rects[:, 0]
+    top = rects[:, 1]
+    sized = (rects[:, 2] > 0) & (rects[:, 3] > 0)
+    return (sized[None, :] &
+            (left[None, :] < (x + width)[:, None]) & (x[:, None] < (left + rects[:, 2])[None, :]) &
+            (top[None, :] < (y + height)[:, None]) & (y[:, None] < (top + rects[:, 3])[None, :]))
+
+
+class ProjectileStore:
+    """Every bullet in the world, kept in NumPy arrays indexed by slot.
+
+    All bullets advance in one vectorized step per tick and are tested in
+    batch against the walls and entities of the chunks they are in, whoever
+    fired them. Slots are reused, a generation counter per slot tells Bullet
+    views whether their bullet is still the one in the slot.
+    """
+
+    def __init__(self, world, capacity: int = config.PROJECTILE_INITIAL_CAPACITY):
+        self._world = world
+        self._allocate(capacity)
+        self._views = {}  # Slot -> Bullet view of the bullet in it, dropped when the bullet dies
+        self._wall_rects = (None, None)  # Nearby walls list and its collision rects array
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.team = np.zeros(capacity, dtype=np.int8)
+        self.owner = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.generation = np.zeros(capacity, dtype=np.int64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old_capacity = self.capacity
+        self.capacity *= 2
+        for name in ARRAY_FIELDS:
+            old = getattr(self, name)
+            new = np.zeros((self.capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:old_capacity] = old
+            setattr(self, name, new)
+        self._free.extend(range(self.capacity - 1, old_capacity - 1, -1))
+
+    def clear(self):
+        self.alive[:] = False
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self._views.clear()
+
+    def spawn(self, world_x: float, world_y: float, target_world_x: float, target_world_y: float,
+              team: int = TEAM_ENEMY, owner_id: int = 0, color: tuple[int, int, int] | None = None) -> int:
+        """Fire a bullet from (world_x, world_y) towards the target point, returns its slot"""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+
+        speed = config.ENEMY_BULLET_SPEED if team == TEAM_ENEMY else config.PLAYER_BULLET_SPEED
+        dx = target_world_x - world_x
+        dy = target_world_y - world_y
+        length = math.sqrt(dx * dx + dy * dy)
+
+        self.x[slot] = self.prev_x[slot] = world_x
+        self.y[slot] = self.prev_y[slot] = world_y
+        self.vx[slot] = dx / length * speed if length > 0 else 0
+        self.vy[slot] = dy / length * speed if length > 0 else 0
+        self.team[slot] = team
+        self.owner[slot] = owner_id
+        self.color[slot] = color or ((255, 0, 0) if team == TEAM_ENEMY else config.PLAYER_BULLET_COLOR)
+        self.alive[slot] = True
+        self.generation[slot] += 1
+        return slot
+
+    def kill(self, slot: int):
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self._free.append(slot)
+            # Views outlive their bullet and report it inactive, the next bullet in the slot gets a new one
+            self._views.pop(slot, None)
+
+    def is_alive(self, slot: int, generation: int) -> bool:
+        return bool(self.alive[slot]) and self.generation[slot] == generation
+
+    def count(self, team: int | None = None) -> int:
+        if team is None:
+            return int(np.count_nonzero(self.alive))
+        return int(np.count_nonzero(self.alive & (self.team == team)))
+
+    def get_bullets(self, owner_id: int | None = None) -> list:
+        """Bullet views of the live bullets, optionally only the ones fired by owner_id"""
+        from bullet import Bullet
+
+        mask = self.alive if owner_id is None else self.alive & (self.owner == owner_id)
+        views = []
+        for slot in np.flatnonzero(mask).tolist():
+            view = self._views.get(slot)
+            if view is None:
+                view = self._views[slot] = Bullet.from_slot(self._world, slot)
+            views.append(view)
+        return views
+
+    def save_previous_positions(self):
+        np.copyto(self.prev_x, self.x)
+        np.copyto(self.prev_y, self.y)
+
+    def _get_nearby(self, grid, x: np.ndarray, y: np.ndarray) -> list:
+        """Objects of a grid in the neighborhood of any of the given points"""
+        cell_size = grid.cell_size
+        cells = set(zip((x // cell_size).astype(np.int64).tolist(), (y // cell_size).astype(np.int64).tolist()))
+        if len(cells) == 1:
+            cell_x, cell_y = cells.pop()
+            return grid.get_neighboring_objects(cell_x * cell_size, cell_y * cell_size)
+
+        nearby = {}
+        for cell_x, cell_y in cells:
+            nearby.update(dict.fromkeys(grid.get_neighboring_objects(cell_x * cell_size, cell_y * cell_size)))
+        return list(nearby)
+
+    def move(self, slots: np.ndarray) -> np.ndarray:
+        """Advance the given bullets, stopping the ones that hit a wall. Returns the slots that moved."""
+        world = self._world
+        size = config.BULLET_SIZE
+        new_x = self.x[slots] + self.vx[slots] * world.dt
+        new_y = self.y[slots] + self.vy[slots] * world.dt
+
+        blocked = np.zeros(len(slots), dtype=bool)
+        walls = self._get_nearby(world.walls, new_x, new_y)
+        if walls:
+            # Walls never move, their rects are kept while the grid hands out the same neighbor list
+            cached_walls, rects = self._wall_rects
+            if cached_walls is not walls:
+                rects = np.array([wall.get_collision_rect() for wall in walls], dtype=float)
+                self._wall_rects = (walls, rects)
+            blocked = rects_overlap(new_x - size / 2, new_y - size / 2, size, size, rects).any(axis=1)
+
+        # Bullets that fly out of every player's resident chunks would never hit anything again
+        if world.players:
+            limit = world.CHUNK_SIZE * (config.CHUNK_RESIDENT_RADIUS + 1)
+            out_of_range = np.ones(len(slots), dtype=bool)
+            for player in world.players:
+                out_of_range &= (np.abs(new_x - player.world_x) > limit) | (np.abs(new_y - player.world_y) > limit)
+            blocked |= out_of_range
+
+        for slot in slots[blocked].tolist():
+            self.kill(slot)
+
+        moved = ~blocked
+        slots = slots[moved]
+        self.x[slots] = new_x[moved]
+        self.y[slots] = new_y[moved]
+        return slots
+
+    def update(self):
+        slots = np.flatnonzero(self.alive)
+        if len(slots) == 0:
+            return
+
+        slots = self.move(slots)
+        if len(slots) == 0:
+            return
+
+        team = self.team[slots]
+        self._resolve_enemy_hits(slots[team == TEAM_PLAYER])
+        if not self._world.is_game_over():
+            self._resolve_player_hits(slots[team == TEAM_ENEMY])
+
+    def _resolve_enemy_hits(self, slots: np.ndarray):
+        world = self._world
+        if len(slots) == 0:
+            return
+
+        size = config.BULLET_SIZE
+        enemies = [enemy for enemy in self._get_nearby(world.enemies, self.x[slots], self.y[slots]) if not enemy.dead]
+        if not enemies:
+            return
+
+        rects = np.array([enemy.get_collision_rect() for enemy in enemies], dtype=float)
+        hits = rects_overlap(self.x[slots] - size / 2, self.y[slots] - size / 2, size, size, rects)
+        for row in np.flatnonzero(hits.any(axis=1)).tolist():
+            # An earlier bullet this tick may have killed the enemy already
+            hit_enemies = [enemies[column] for column in np.flatnonzero(hits[row]).tolist() if not enemies[column].dead]
+            if not hit_enemies:
+                continue
+
+            slot = int(slots[row])
+            owner_id = int(self.owner[slot])
+            # Bullets without an owner count for the camera player, kills of a player who left count for nobody
+            killer = world.get_player_by_id(owner_id) if owner_id else world.player
+            self.kill(slot)
+            for enemy in hit_enemies:
+                if enemy in world.enemies:
+                    enemy.take_damage(killer)
+                    # Chance to spawn bonus
+                    if world.rng.random() < config.BONUS_SPAWN_CHANCE:
+                        world.spawn_bonus(enemy.world_x, enemy.world_y)
+
+    def _resolve_player_hits(self, slots: np.ndarray):
+        world = self._world
+        players = [player for player in world.players if player.lives > 0]
+        if len(slots) == 0 or not players:
+            return
+
+        size = config.BULLET_SIZE
+        rects = np.array([player.get_collision_rect() for player in players], dtype=float)
+        hits = rects_overlap(self.x[slots] - size / 2, self.y[slots] - size / 2, size, size, rects)
+        for column in np.flatnonzero(hits.any(axis=0)).tolist():
+            player = players[column]
+            for slot in slots[hits[:, column]].tolist():
+                # Bullets pass through the player while it is invulnerable
+                if player.invulnerable_timer > 0:
+                    break
+                # A bullet stops at the first player it hits
+                if not self.alive[slot]:
+                    continue
+
+                player.take_damage()
+                self.kill(slot)
+
+        # The game is over once every player ran out of lives
+        if all(player.lives <= 0 for player in world.players):
+            world.end_game()
+
+    def get_screen_positions(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Slots and interpolated screen positions of the live bullets that are on screen"""
+        slots = np.flatnonzero(self.alive)
+        world = self._world
+        size = config.BULLET_SIZE
+        alpha = world.render_alpha
+        offset_x, offset_y = world.get_render_offset()
+        screen_x = self.prev_x[slots] + (self.x[slots] - self.prev_x[slots]) * alpha + offset_x + config.SCREEN_WIDTH // 2
+        screen_y = self.prev_y[slots] + (self.y[slots] - self.prev_y[slots]) * alpha + offset_y + config.SCREEN_HEIGHT // 2
+
+        visible = ((screen_x > -size) & (screen_x < config.SCREEN_WIDTH + size) &
+                   (screen_y > -size) & (screen_y < config.SCREEN_HEIGHT + size))
+        return slots[visible], screen_x[visible], screen_y[visible]
+
+    def draw(self, screen: pygame.Surface):
+        if not self.alive.any():
+            return
+
+        size = config.BULLET_SIZE
+        slots, screen_x, screen_y = self.get_screen_positions()
+        colors = self.color[slots].tolist()
+        for color, x, y in zip(colors, screen_x.tolist(), screen_y.tolist()):
+            pygame.draw.circle(screen, color, (x, y), size)
+            if config.DEBUG:
+                pygame.draw.rect(screen, (0, 255, 0), (x - size / 2, y - size / 2, size, size), 1)
@@ -0,0 +1,165 @@
+import hashlib, struct
+from typing import NamedTuple
+import numpy as np
+import config
+
+MAGIC = b'TDRP'
+VERSION = 1
+
+# Magic, version, step dt, hash interval, seeds, frames, hashes
+HEADER = struct.Struct('<4sHdIIII')
+
+FRAME_DTYPE = np.dtype([('steps', 'u1'), ('forward', 'i1'), ('rotation', '<f4'), ('shoot', '?'), ('restart', '?')])
+HASH_DTYPE = np.dtype([('step', '<u4'), ('hash', '<u8')])
+
+
+class InputFrame(NamedTuple):
+    """Input of one rendered frame and the simulation steps it ran"""
+    steps: int
+    forward: float
+    rotation: float
+    shoot: bool
+    restart: bool
+
+
+def hash_world_state(world) -> int:
+    """64-bit digest of everything the simulation decides: player, enemies, bonuses and bullets"""
+    digest = hashlib.blake2b(digest_size=8)
+    player = world.player
+    if player:
+        digest.update(struct.pack('<dddiii', player.world_x, player.world_y, player.rotation,
+                                  player.lives, player.kills, player.bullets_left))
+    for enemy in world.enemies:
+        digest.update(struct.pack('<ddb?', enemy.world_x, enemy.world_y, enemy.direction, enemy.dead))
+    for bonus in world.bonuses:
+        digest.update(struct.pack('<dd?', bonus.world_x, bonus.world_y, bonus.active))
+        digest.update(bonus.type.encode())
+    store = world.projectiles
+    alive = store.alive
+    digest.update(store.x[alive].tobytes())
+    digest.update(store.y[alive].tobytes())
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class Recording:
+    """A recorded session: the seed of every game played, the input of every frame and state hashes"""
+
+    def __init__(self, dt: float, hash_interval: int = config.REPLAY_HASH_INTERVAL):
+        self.dt = dt
+        self.hash_interval = hash_interval
+        self.seeds: list[int] = []
+        self.frames: list[InputFrame] = []
+        self.hashes: list[tuple[int, int]] = []  # (simulation step, state hash)
+
+    def save(self, path: str):
+        frames = np.array(self.frames, dtype=FRAME_DTYPE)
+        hashes = np.array(self.hashes, dtype=HASH_DTYPE)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.dt, self.hash_interval, len(self.seeds), len(frames), len(hashes)))
+            file.write(np.array(self.seeds, dtype='<i8').tobytes())
+            file.write(frames.tobytes())
+            file.write(hashes.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated input recording")
+        magic, version, dt, hash_interval, seed_count, frame_count, hash_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not an input recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported input recording version {version}")
+        size = HEADER.size + seed_count * 8 + frame_count * FRAME_DTYPE.itemsize + hash_count * HASH_DTYPE.itemsize
+        if len(data) != size:
+            raise ValueError(f"Input recording is {len(data)} bytes, its header expects {size}")
+
+        recording = cls(dt, hash_interval)
+        position = HEADER.size
+        seeds = np.frombuffer(data, '<i8', seed_count, position)
+        position += seeds.nbytes
+        frames = np.frombuffer(data, FRAME_DTYPE, frame_count, position)
+        position += frames.nbytes
+        hashes = np.frombuffer(data, HASH_DTYPE, hash_count, position)
+
+        recording.seeds = seeds.tolist()
+        recording.frames = [InputFrame(*frame) for frame in frames.tolist()]
+        recording.hashes = [tuple(entry) for entry in hashes.tolist()]
+        return recording
+
+
+class InputRecorder:
+    """Records the main loop's input, frame by frame, with a state hash every hash_interval steps.
+
+    Chunks are generated on the main thread while recording, chunks
+    prefetched in the background would show up at a different step on
+    replay.
+    """
+
+    def __init__(self, world, path: str, dt: float):
+        self._world = world
+        self.path = path
+        self.recording = Recording(dt)
+        self.steps = 0
+        world.chunk_loader.background = False
+
+    def start_game(self):
+        """Call after every World.start_game"""
+        self.recording.seeds.append(self._world.seed)
+
+    def record_step(self):
+        """Call after every World.step"""
+        self.steps += 1
+        if self.steps % self.recording.hash_interval == 0:
+            self.recording.hashes.append((self.steps, hash_world_state(self._world)))
+
+    def record_frame(self, frame: InputFrame):
+        self.recording.frames.append(frame)
+
+    def save(self):
+        self.recording.save(self.path)
+
+
+class InputReplayer:
+    """Feeds a recording back into a world frame by frame and checks its state hashes.
+
+    mismatch is the first simulation step whose state differs from the
+    recorded one, None while the replay is in sync.
+    """
+
+    def __init__(self, world, recording: Recording):
+        self._world = world
+        self.recording = recording
+        self.steps = 0
+        self.mismatch: int | None = None
+        self._frame_index = 0
+        self._seed_index = 0
+        self._hashes = dict(recording.hashes)
+        world.chunk_loader.background = False
+        world.dt = recording.dt
+
+    def start_game(self):
+        self._world.start_game(self.recording.seeds[self._seed_index])
+        self._seed_index += 1
+
+    def is_finished(self) -> bool:
+        return self._frame_index >= len(self.recording.frames)
+
+    def play_frame(self) -> InputFrame:
+        """Run the next recorded frame's restart and simulation steps"""
+        frame = self.recording.frames[self._frame_index]
+        self._frame_index += 1
+
+        world = self._world
+        if frame.restart:
+            self.start_game()
+        world.dt = self.recording.dt
+        for _ in range(frame.steps):
+            world.step(frame.forward, frame.rotation, frame.shoot)
+            self.steps += 1
+            expected = self._hashes.get(self.steps)
+            if expected is not None and self.mismatch is None and hash_world_state(world) != expected:
+                self.mismatch = self.steps
+        return frame
@@ -1,21 +1,58 @@
 from abc import ABC, abstractmethod
 from world import World
-import pygame
+import pygame, geometry
 
 class ScreenObject(ABC):
-    _id: int = 0
+    # No per-instance __dict__, subclasses list their own attributes too
+    __slots__ = ('_world', '_grid', '_grid_cell', '_id', 'width', 'height',
+                 '_world_x', '_world_y', 'prev_world_x', 'prev_world_y')
+    _last_id: int = 0
 
     def __init__(self, world: World, world_x: float, world_y: float, width: float, height: float):
         self._world = world
+        self._grid = None
+        self._grid_cell = None
         self.width = width
         self.height = height
         self.world_x = world_x
         self.world_y = world_y
-        ScreenObject._id += 1
-        self._id = ScreenObject._id
+        self.prev_world_x = world_x
+        self.prev_world_y = world_y
+        ScreenObject._last_id += 1
+        self._id = ScreenObject._last_id
+
+    @property
+    def world_x(self) -> float:
+        return self._world_x
+
+    @world_x.setter
+    def world_x(self, value: float):
+        self._world_x = value
+        if self._grid is not None:
+            self._grid.move(self)
+
+    @property
+    def world_y(self) -> float:
+        return self._world_y
+
+    @world_y.setter
+    def world_y(self, value: float):
+        self._world_y = value
+        if self._grid is not None:
+            self._grid.move(self)
+
+    def save_previous_position(self):
+        self.prev_world_x = self._world_x
+        self.prev_world_y = self._world_y
+
+    def get_render_position(self) -> tuple[float, float]:
+        """Position interpolated between the last two simulation steps"""
+        alpha = self._world.render_alpha
+        return (self.prev_world_x + (self._world_x - self.prev_world_x) * alpha,
+                self.prev_world_y + (self._world_y - self.prev_world_y) * alpha)
 
     def get_screen_coordinates(self):
-        return self._world.world_to_screen_coordinates(self.world_x, self.world_y)
+        return self._world.world_to_screen_coordinates(*self.get_render_position())
 
     def get_collision_rect(self, dx: float = 0, dy: float = 0) -> tuple[float, float, float, float]:
         return (self.world_x + dx - self.width / 2, self.world_y + dy - self.height / 2, self.width, self.height)
@@ -25,5 +62,12 @@ class ScreenObject(ABC):
         screen_coll_x, screen_coll_y = self._world.world_to_screen_coordinates(coll_x, coll_y)
         return (screen_coll_x, screen_coll_y, coll_w, coll_h)
 
+    def is_near(self, rect_world_x, rect_world_y, rect_width, rect_height) -> bool:
+        """False when the rect is too far to collide, truncating to integers moves an edge by less than 2"""
+        left, top, width, height = self.get_collision_rect()
+        return (rect_world_x < left + width + 2 and left < rect_world_x + rect_width + 2 and
+                rect_world_y < top + height + 2 and top < rect_world_y + rect_height + 2)
+
     def check_collision(self, rect_world_x, rect_world_y, rect_width, rect_height):
-        return pygame.Rect(*self.get_collision_rect()).colliderect(rect_world_x, rect_world_y, rect_width, rect_height)
+        # Same result as pygame.Rect.colliderect, without building a Rect per check
+        return geometry.rects_collide(*self.get_collision_rect(), rect_world_x, rect_world_y, rect_width, rect_height)
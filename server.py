@@ -0,0 +1,494 @@
+"""Authoritative multiplayer server: one World shared by every connected player.
+
+Run with `python -m server --port 7777`, or `python -m server --simulate 32
+--seconds 30` to connect bot clients over localhost and report the tick
+cost and bandwidth.
+
+The server steps the World SERVER_TICK_RATE times per second with the
+latest input of every client and sends each client a snapshot of the
+entities in the 3x3 chunks around its player. Walls are never sent, the
+world seed rebuilds them. Snapshots are deltas against the last snapshot
+the client acknowledged: only the entities that appeared or changed, with
+a mask of their changed fields, and the ids of the ones that left.
+
+Messages are length-prefixed little-endian structs:
+- HELLO, client: protocol version.
+- WELCOME, server: the client's player id, the world seed and the tick
+  rate. Sent again when a new game starts, the next snapshot is full.
+- INPUT, client: the last snapshot tick received, forward, rotation and
+  shoot. The server keeps the latest input until the next one arrives.
+- SNAPSHOT, server: tick, baseline tick (0 for a full snapshot), the
+  removed ids and the changed entities. Positions are in 1/8 world units
+  and rotations in 1/65536 turns.
+"""
+import argparse, asyncio, json, math, struct, time
+import numpy as np
+import config
+
+from world import World
+from player import Player
+from enemy import Enemy
+from wall import Wall
+from bonus import Bonus, BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES
+from policies import MAX_ROTATION, RandomPolicy
+
+PROTOCOL_VERSION = 1
+MSG_HELLO, MSG_WELCOME, MSG_INPUT, MSG_SNAPSHOT = range(1, 5)
+MAX_CLIENT_MESSAGE = 64  # Bytes, client messages are a few fixed-size structs
+
+LENGTH = struct.Struct('<I')
+# Type, protocol version
+HELLO = struct.Struct('<BH')
+# Type, player id, world seed, tick rate
+WELCOME = struct.Struct('<BIqH')
+# Type, acknowledged tick, forward, rotation, shoot
+INPUT = struct.Struct('<BIbb?')
+# Type, tick, baseline tick, removed count, changed count
+SNAPSHOT = struct.Struct('<BIIHH')
+# Network id, kind, changed field mask, followed by the changed fields
+ENTITY = struct.Struct('<IBB')
+
+KIND_PLAYER, KIND_ENEMY, KIND_BONUS, KIND_BULLET = range(4)
+FIELD_FORMATS = 'iiHhhh'  # x, y and four kind-specific fields
+FULL_MASK = (1 << len(FIELD_FORMATS)) - 1
+POSITION_SCALE = 8
+ROTATION_SCALE = 65536 / 360
+INPUT_SCALE = 127
+BULLET_ID = 1 << 31  # Bullets are not ScreenObjects, their ids are the slot and generation with the top bit set
+BONUS_TYPES = (BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES)
+
+_entity_structs: dict[int, struct.Struct] = {}
+
+
+def get_entity_struct(mask: int) -> struct.Struct:
+    """Entity header and the fields present in the mask"""
+    entity_struct = _entity_structs.get(mask)
+    if entity_struct is None:
+        fields = ''.join(field for i, field in enumerate(FIELD_FORMATS) if mask >> i & 1)
+        entity_struct = _entity_structs[mask] = struct.Struct(ENTITY.format + fields)
+    return entity_struct
+
+
+def pack_message(payload: bytes) -> bytes:
+    return LENGTH.pack(len(payload)) + payload
+
+
+async def read_message(reader: asyncio.StreamReader, max_size: int | None = None) -> bytes:
+    length, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    if max_size is not None and length > max_size:
+        raise ValueError(f"Message of {length} bytes exceeds {max_size}")
+    return await reader.readexactly(length)
+
+
+def quantize(value: float) -> int:
+    return round(value * POSITION_SCALE)
+
+
+def encode_entity(net_id: int, old: tuple | None, entity: tuple) -> bytes:
+    if old is None or old[0] != entity[0]:
+        return get_entity_struct(FULL_MASK).pack(net_id, entity[0], FULL_MASK, *entity[1:])
+
+    mask = 0
+    fields = []
+    for i in range(len(FIELD_FORMATS)):
+        if old[i + 1] != entity[i + 1]:
+            mask |= 1 << i
+            fields.append(entity[i + 1])
+    return get_entity_struct(mask).pack(net_id, entity[0], mask, *fields)
+
+
+def encode_snapshot(tick: int, baseline_tick: int, baseline: dict, state: dict, records: dict | None = None) -> bytes:
+    """Pack the difference between two {network id: (kind, *fields)} states.
+
+    Clients near each other share entity states, records caches the packed
+    entities of one tick by (network id, baseline entity) across their snapshots.
+    """
+    removed = [net_id for net_id in baseline if net_id not in state]
+    entities = []
+    for net_id, entity in state.items():
+        old = baseline.get(net_id)
+        if old is entity or old == entity:
+            continue
+
+        if records is None:
+            entities.append(encode_entity(net_id, old, entity))
+            continue
+        key = (net_id, id(old))
+        record = records.get(key)
+        if record is None:
+            record = records[key] = encode_entity(net_id, old, entity)
+        entities.append(record)
+
+    return b''.join((SNAPSHOT.pack(MSG_SNAPSHOT, tick, baseline_tick, len(removed), len(entities)),
+                     np.array(removed, dtype='<u4').tobytes(), *entities))
+
+
+def decode_snapshot(data: bytes, baselines: dict[int, dict]) -> tuple[int, dict]:
+    """Tick and full state of a snapshot, applied on top of its baseline from baselines"""
+    _, tick, baseline_tick, removed_count, changed_count = SNAPSHOT.unpack_from(data)
+    if baseline_tick and baseline_tick not in baselines:
+        raise ValueError(f"Snapshot {tick} is a delta against unknown tick {baseline_tick}")
+
+    state = dict(baselines[baseline_tick]) if baseline_tick else {}
+    position = SNAPSHOT.size
+    for net_id in np.frombuffer(data, '<u4', removed_count, position).tolist():
+        del state[net_id]
+    position += removed_count * 4
+
+    for _ in range(changed_count):
+        net_id, kind, mask = ENTITY.unpack_from(data, position)
+        entity_struct = get_entity_struct(mask)
+        fields = entity_struct.unpack_from(data, position)[3:]
+        position += entity_struct.size
+        if mask == FULL_MASK:
+            state[net_id] = (kind, *fields)
+        else:
+            entity = list(state[net_id])
+            changed = iter(fields)
+            for i in range(len(FIELD_FORMATS)):
+                if mask >> i & 1:
+                    entity[i + 1] = next(changed)
+            state[net_id] = tuple(entity)
+    return tick, state
+
+
+class InterestIndex:
+    """Network state of the entities in every chunk, built once per tick and shared by all clients"""
+
+    def __init__(self, world: World):
+        self._world = world
+        self._chunks: dict[tuple, dict] = {}
+        self._areas: dict[tuple, dict] = {}
+        self._dynamic: dict[tuple, dict] = {}  # Players and bullets bucketed by chunk
+
+    def rebuild(self):
+        world = self._world
+        self._chunks = {}
+        self._areas = {}
+        self._dynamic = {}
+        for player in world.players:
+            flags = player.bullets_left | (player.invulnerable_timer > 0) << 4 | (player.night_vision_timer > 0) << 5
+            self._add(world.get_chunk_coords(player.world_x, player.world_y), player._id, (
+                KIND_PLAYER, quantize(player.world_x), quantize(player.world_y),
+                round(player.rotation * ROTATION_SCALE) & 0xffff, player.lives, player.kills, flags))
+
+        store = world.projectiles
+        slots = np.flatnonzero(store.alive)
+        if len(slots):
+            chunk_xs = (store.x[slots] // world.CHUNK_SIZE).tolist()
+            chunk_ys = (store.y[slots] // world.CHUNK_SIZE).tolist()
+            xs = np.round(store.x[slots] * POSITION_SCALE).astype(np.int64).tolist()
+            ys = np.round(store.y[slots] * POSITION_SCALE).astype(np.int64).tolist()
+            generations = store.generation[slots].tolist()
+            teams = store.team[slots].tolist()
+            for slot, chunk_x, chunk_y, x, y, generation, team in zip(slots.tolist(), chunk_xs, chunk_ys, xs, ys, generations, teams):
+                self._add((chunk_x, chunk_y), BULLET_ID | slot << 8 | generation & 0xff, (KIND_BULLET, x, y, team, 0, 0, 0))
+
+    def _add(self, chunk: tuple, net_id: int, entity: tuple):
+        self._dynamic.setdefault(chunk, {})[net_id] = entity
+
+    def get_chunk_state(self, chunk_x: float, chunk_y: float) -> dict:
+        state = self._chunks.get((chunk_x, chunk_y))
+        if state is not None:
+            return state
+
+        world = self._world
+        state = {}
+        for enemy in world.enemies.get_objects_in_cell(chunk_x, chunk_y):
+            state[enemy._id] = (KIND_ENEMY, quantize(enemy.world_x), quantize(enemy.world_y),
+                                enemy.direction + 1, enemy.dead, 0, 0)
+        for bonus in world.bonuses.get_objects_in_cell(chunk_x, chunk_y):
+            if bonus.active:
+                state[bonus._id] = (KIND_BONUS, quantize(bonus.world_x), quantize(bonus.world_y),
+                                    BONUS_TYPES.index(bonus.type), 0, 0, 0)
+        state.update(self._dynamic.get((chunk_x, chunk_y), {}))
+        self._chunks[(chunk_x, chunk_y)] = state
+        return state
+
+    def get_area_state(self, world_x: float, world_y: float) -> dict:
+        """Entities in the 3x3 chunks around a point, the same dict for every point of a chunk"""
+        chunk_x, chunk_y = self._world.get_chunk_coords(world_x, world_y)
+        state = self._areas.get((chunk_x, chunk_y))
+        if state is not None:
+            return state
+
+        state = {}
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                state.update(self.get_chunk_state(chunk_x + dx, chunk_y + dy))
+        self._areas[(chunk_x, chunk_y)] = state
+        return state
+
+
+class ClientSession:
+    """A connected client: its player, latest input and the snapshots it may use as baselines"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.player: Player | None = None
+        self.input = (0.0, 0.0, False)
+        self.acked_tick = 0
+        self.history: dict[int, dict] = {}  # Tick -> state sent in that tick's snapshot
+        self.bytes_sent = 0
+        self.snapshots_skipped = 0
+
+    def send(self, payload: bytes):
+        message = pack_message(payload)
+        self.writer.write(message)
+        self.bytes_sent += len(message)
+
+    def acknowledge(self, tick: int):
+        if tick <= self.acked_tick or tick not in self.history:
+            return
+        self.acked_tick = tick
+        for old_tick in [old_tick for old_tick in self.history if old_tick < tick]:
+            del self.history[old_tick]
+
+    def reset_baselines(self):
+        self.acked_tick = 0
+        self.history = {}
+
+
+class GameServer:
+    """Steps the World at a fixed rate and streams interest-managed delta snapshots to every client"""
+
+    def __init__(self, seed: int | None = None, tick_rate: int = config.SERVER_TICK_RATE):
+        # The server never draws nor plays sounds
+        config.HEADLESS = True
+        self.world = World(Player, Enemy, Wall, Bonus, seed=seed)
+        self.world.dt = 1 / tick_rate
+        self.tick_rate = tick_rate
+        self.tick = 0
+        self.clients: list[ClientSession] = []
+        self.interest = InterestIndex(self.world)
+        self.tick_times: list[float] = []
+        self.snapshot_times: list[float] = []
+        self.entities_sent = 0
+        self.games = 0
+        self._server: asyncio.Server | None = None
+
+    def start_game(self):
+        """New game for everyone connected, clients get a WELCOME and a full snapshot"""
+        world = self.world
+        world.start_game(players=len(self.clients))
+        for client, player in zip(self.clients, world.players):
+            client.player = player
+            self.welcome(client)
+        self.games += 1
+
+    def welcome(self, client: ClientSession):
+        client.reset_baselines()
+        client.send(WELCOME.pack(MSG_WELCOME, client.player._id, self.world.seed, self.tick_rate))
+
+    def join(self, client: ClientSession):
+        self.clients.append(client)
+        if self.world.player is None:
+            self.start_game()
+            return
+        client.player = self.world.add_player()
+        self.welcome(client)
+
+    def leave(self, client: ClientSession):
+        self.clients.remove(client)
+        if client.player is not None:
+            self.world.remove_player(client.player)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = None
+        try:
+            message_type, version = HELLO.unpack(await read_message(reader, MAX_CLIENT_MESSAGE))
+            if message_type != MSG_HELLO or version != PROTOCOL_VERSION:
+                return
+
+            client = ClientSession(writer)
+            self.join(client)
+            while True:
+                message = await read_message(reader, MAX_CLIENT_MESSAGE)
+                message_type, acked_tick, forward, rotation, shoot = INPUT.unpack(message)
+                if message_type != MSG_INPUT:
+                    break
+                client.acknowledge(acked_tick)
+                client.input = (max(-1.0, min(1.0, forward / INPUT_SCALE)),
+                                max(-MAX_ROTATION, min(MAX_ROTATION, rotation / INPUT_SCALE * MAX_ROTATION)),
+                                shoot)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, struct.error):
+            pass
+        finally:
+            if client is not None:
+                self.leave(client)
+            writer.close()
+
+    def step(self):
+        """Advance the world one tick and send every client its snapshot"""
+        world = self.world
+        if world.player is None:
+            return
+
+        started = time.perf_counter()
+        if world.is_game_over():
+            self.start_game()
+        world.step_players({client.player: client.input for client in self.clients})
+        self.tick += 1
+
+        snapshot_started = time.perf_counter()
+        self.interest.rebuild()
+        records = {}
+        # Clients in the same chunk with the same baseline get the same snapshot
+        snapshots = {}
+        for client in self.clients:
+            if client.writer.transport.get_write_buffer_size() > config.SERVER_MAX_WRITE_BUFFER:
+                # A client that does not keep up gets the next snapshot, against its last acknowledged one
+                client.snapshots_skipped += 1
+                continue
+
+            player = client.player
+            state = self.interest.get_area_state(player.world_x, player.world_y)
+            baseline = client.history.get(client.acked_tick)
+            baseline_tick = client.acked_tick if baseline is not None else 0
+            key = (id(state), baseline_tick, id(baseline))
+            snapshot = snapshots.get(key)
+            if snapshot is None:
+                snapshot = snapshots[key] = encode_snapshot(self.tick, baseline_tick, baseline or {}, state, records)
+            client.send(snapshot)
+            client.history[self.tick] = state
+            self.entities_sent += len(state)
+
+            # Unacknowledged snapshots past the history are dropped, the oldest first
+            if len(client.history) > config.SERVER_SNAPSHOT_HISTORY:
+                del client.history[next(iter(client.history))]
+
+        finished = time.perf_counter()
+        self.tick_times.append(finished - started)
+        self.snapshot_times.append(finished - snapshot_started)
+
+    async def serve(self, host: str = config.SERVER_HOST, port: int = config.SERVER_PORT) -> int:
+        """Start accepting clients, returns the port listened on"""
+        self._server = await asyncio.start_server(self.handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def run(self, duration: float | None = None):
+        """Tick at the fixed rate, for duration seconds or forever"""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        next_tick = loop.time()
+        end_time = next_tick + duration if duration is not None else math.inf
+        while next_tick < end_time:
+            self.step()
+            next_tick += period
+            # Late ticks run right away to catch up rather than stretching the game
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for client in list(self.clients):
+            client.writer.close()
+
+    def get_stats(self, elapsed: float) -> dict:
+        ticks = max(len(self.tick_times), 1)
+        tick_ms = sorted(tick_time * 1000 for tick_time in self.tick_times) or [0.0]
+        bytes_sent = sum(client.bytes_sent for client in self.clients)
+        return {
+            'clients': len(self.clients),
+            'ticks': len(self.tick_times),
+            'games': self.games,
+            'tick_ms_mean': round(sum(tick_ms) / ticks, 3),
+            'tick_ms_p99': round(tick_ms[min(int(ticks * 0.99), ticks - 1)], 3),
+            'tick_ms_max': round(tick_ms[-1], 3),
+            'snapshot_ms_mean': round(sum(self.snapshot_times) * 1000 / ticks, 3),
+            'tick_budget_ms': round(1000 / self.tick_rate, 3),
+            'entities_per_snapshot': round(self.entities_sent / max(ticks * len(self.clients), 1), 1),
+            'bytes_per_client_per_sec': round(bytes_sent / max(len(self.clients), 1) / max(elapsed, 1e-9)),
+            'snapshots_skipped': sum(client.snapshots_skipped for client in self.clients),
+        }
+
+
+class BotClient:
+    """Plays over the network like a real client, with a random policy's input and the decoded snapshots"""
+
+    def __init__(self, seed: int = 0):
+        self.policy = RandomPolicy(seed)
+        self.player_id = 0
+        self.seed = 0
+        self.tick = 0
+        self.state: dict = {}
+        self.snapshots = 0
+        self.bytes_received = 0
+        self._baselines: dict[int, dict] = {}
+
+    async def run(self, host: str, port: int, duration: float):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(pack_message(HELLO.pack(MSG_HELLO, PROTOCOL_VERSION)))
+        end_time = asyncio.get_running_loop().time() + duration
+        try:
+            while asyncio.get_running_loop().time() < end_time:
+                message = await read_message(reader)
+                self.bytes_received += LENGTH.size + len(message)
+                if message[0] == MSG_WELCOME:
+                    _, self.player_id, self.seed, _ = WELCOME.unpack(message)
+                    self.policy.reset(None)
+                    self._baselines = {}
+                elif message[0] == MSG_SNAPSHOT:
+                    self.receive_snapshot(message)
+                    forward, rotation, shoot = self.policy.act(None)
+                    writer.write(pack_message(INPUT.pack(MSG_INPUT, self.tick, round(forward * INPUT_SCALE),
+                                                         round(rotation / MAX_ROTATION * INPUT_SCALE), shoot)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def receive_snapshot(self, message: bytes):
+        self.tick, self.state = decode_snapshot(message, self._baselines)
+        baseline_tick = SNAPSHOT.unpack_from(message)[2]
+        # The server only deltas against acknowledged ticks, older ones are never needed again
+        self._baselines = {tick: state for tick, state in self._baselines.items() if tick >= baseline_tick}
+        self._baselines[self.tick] = self.state
+        self.snapshots += 1
+
+
+async def simulate(clients: int, seconds: float, seed: int | None = None, tick_rate: int = config.SERVER_TICK_RATE) -> dict:
+    """Run a server with bot clients connected over localhost, returns the server stats"""
+    server = GameServer(seed, tick_rate)
+    port = await server.serve(config.SERVER_HOST, 0)
+    bots = [BotClient(i) for i in range(clients)]
+    bot_tasks = [asyncio.create_task(bot.run(config.SERVER_HOST, port, seconds + 1)) for bot in bots]
+
+    # Let every bot join before the clock starts
+    while len(server.clients) < clients:
+        await asyncio.sleep(0.01)
+    start_time = time.perf_counter()
+    await server.run(seconds)
+    stats = server.get_stats(time.perf_counter() - start_time)
+    await server.close()
+    await asyncio.gather(*bot_tasks)
+    stats['snapshots_received'] = sum(bot.snapshots for bot in bots)
+    return stats
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m server', description="Torch Dungeon multiplayer server")
+    parser.add_argument('--host', default=config.SERVER_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT, help="port to listen on")
+    parser.add_argument('--seed', type=int, help="world seed of every game, a new one per game by default")
+    parser.add_argument('--tick-rate', type=int, default=config.SERVER_TICK_RATE, help="simulation steps and snapshots per second")
+    parser.add_argument('--simulate', type=int, metavar='CLIENTS', help="connect this many bot clients over localhost and report the server's cost")
+    parser.add_argument('--seconds', type=float, default=10, help="how long to run the simulation")
+    args = parser.parse_args(argv)
+
+    if args.simulate is not None:
+        print(json.dumps(asyncio.run(simulate(args.simulate, args.seconds, args.seed, args.tick_rate))))
+        return
+
+    async def serve_forever():
+        server = GameServer(args.seed, args.tick_rate)
+        port = await server.serve(args.host, args.port)
+        print(f"Listening on {args.host}:{port}")
+        await server.run()
+
+    asyncio.run(serve_forever())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+import struct
+import numpy as np
+import config
+from projectiles import TEAM_PLAYER
+
+MAGIC = b'TDSV'
+VERSION = 1
+
+# Magic, version, seed, game over, camera offset
+HEADER = struct.Struct('<4sHq?dd')
+# Position, rotation, lives, kills, bullets left, timers
+PLAYER = struct.Struct('<dddiiiddddd')
+# Bullets, chunks
+COUNTS = struct.Struct('<II')
+# Enemies, bonuses of a chunk section
+SECTION = struct.Struct('<HH')
+
+BULLET_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('vx', '<f8'), ('vy', '<f8'), ('team', 'i1'), ('color', 'u1', 3)])
+CHUNK_DTYPE = np.dtype([('x', '<i4'), ('y', '<i4'), ('offset', '<u4'), ('size', '<u4')])
+ENEMY_DTYPE = np.dtype([('index', '<u2'), ('x', '<f8'), ('y', '<f8'), ('direction', 'i1'), ('dead', '?'),
+                        ('dead_timer', '<f8'), ('shoot_delay', '<f8')])
+BONUS_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('type', 'u1')])
+
+
+def get_bonus_types() -> tuple[str, ...]:
+    from bonus import BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES
+    return BONUS_TYPE_AID_KIT, BONUS_TYPE_GOGGLES
+
+
+def encode_chunk_section(enemies: tuple, bonuses: tuple) -> bytes:
+    """Pack a chunk's (layout index, enemy state) and (x, y, type) bonus entries"""
+    enemy_array = np.array([(index, *state) for index, state in enemies], dtype=ENEMY_DTYPE)
+    bonus_types = get_bonus_types()
+    bonus_array = np.array([(x, y, bonus_types.index(bonus_type)) for x, y, bonus_type in bonuses], dtype=BONUS_DTYPE)
+    return SECTION.pack(len(enemy_array), len(bonus_array)) + enemy_array.tobytes() + bonus_array.tobytes()
+
+
+def decode_chunk_section(data) -> tuple[tuple, tuple]:
+    """Enemies and bonuses of a chunk section, the fields of a ChunkRecord"""
+    enemy_count, bonus_count = SECTION.unpack_from(data)
+    enemy_array = np.frombuffer(data, ENEMY_DTYPE, enemy_count, SECTION.size)
+    bonus_array = np.frombuffer(data, BONUS_DTYPE, bonus_count, SECTION.size + enemy_array.nbytes)
+
+    bonus_types = get_bonus_types()
+    enemies = tuple((index, (x, y, direction, dead, dead_timer, shoot_delay))
+                    for index, x, y, direction, dead, dead_timer, shoot_delay in enemy_array.tolist())
+    bonuses = tuple((x, y, bonus_types[bonus_type]) for x, y, bonus_type in bonus_array.tolist())
+    return enemies, bonuses
+
+
+def encode_world(world) -> bytes:
+    """Pack the whole world: player, bullets and every generated chunk.
+
+    Walls are not stored, the seed rebuilds them. Each chunk is a section
+    of packed enemy and bonus arrays listed in a table, so loading only
+    decodes the ones the player is near. Evicted chunks that were never
+    decoded since the last load are copied as they are.
+    """
+    player = world.player
+    store = world.projectiles
+    alive = np.flatnonzero(store.alive)
+    bullets = np.zeros(len(alive), dtype=BULLET_DTYPE)
+    for name in ('x', 'y', 'vx', 'vy', 'team', 'color'):
+        bullets[name] = getattr(store, name)[alive]
+
+    sections = []
+    table = np.zeros(len(world.generated_chunks), dtype=CHUNK_DTYPE)
+    offset = 0
+    for i, chunk in enumerate(sorted(world.generated_chunks)):
+        record = world.evicted_chunks.get(chunk)
+        if record is None:
+            record = world.get_chunk_record(*chunk)
+        section = bytes(record) if isinstance(record, memoryview) else encode_chunk_section(record.enemies, record.bonuses)
+        table[i] = (chunk[0], chunk[1], offset, len(section))
+        sections.append(section)
+        offset += len(section)
+
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, world.seed, world.is_game_over(), world.offset_x, world.offset_y),
+        PLAYER.pack(player.world_x, player.world_y, player.rotation, player.lives, player.kills, player.bullets_left,
+                    player.shoot_delay, player.invulnerable_timer, player.night_vision_timer,
+                    player.recharge_accumulator, player.recharge_timer),
+        COUNTS.pack(len(bullets), len(table)),
+        bullets.tobytes(),
+        table.tobytes(),
+        *sections,
+    ))
+
+
+def check_chunk_section(section):
+    """Raise ValueError unless the section holds exactly its enemy and bonus arrays"""
+    if len(section) < SECTION.size:
+        raise ValueError("Truncated chunk section")
+    enemy_count, bonus_count = SECTION.unpack_from(section)
+    if len(section) != SECTION.size + enemy_count * ENEMY_DTYPE.itemsize + bonus_count * BONUS_DTYPE.itemsize:
+        raise ValueError("Chunk section size does not match its counts")
+    bonus_types = np.frombuffer(section, BONUS_DTYPE, bonus_count, SECTION.size + enemy_count * ENEMY_DTYPE.itemsize)['type']
+    if bonus_count and bonus_types.max() >= len(get_bonus_types()):
+        raise ValueError("Unknown bonus type in chunk section")
+
+
+def parse_world(data: bytes) -> tuple:
+    """Split a snapshot into its header, player state, bullets, chunk table and sections.
+
+    Every length and offset is checked first, so a short or corrupt file
+    raises ValueError before anything of the current world is touched.
+    """
+    if len(data) < HEADER.size + PLAYER.size + COUNTS.size:
+        raise ValueError("Truncated world snapshot")
+    header = HEADER.unpack_from(data)
+    magic, version = header[:2]
+    if magic != MAGIC:
+        raise ValueError("Not a world snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported world snapshot version {version}")
+
+    position = HEADER.size
+    player_state = PLAYER.unpack_from(data, position)
+    position += PLAYER.size
+    bullet_count, chunk_count = COUNTS.unpack_from(data, position)
+    position += COUNTS.size
+    if len(data) < position + bullet_count * BULLET_DTYPE.itemsize + chunk_count * CHUNK_DTYPE.itemsize:
+        raise ValueError("Truncated world snapshot")
+    bullets = np.frombuffer(data, BULLET_DTYPE, bullet_count, position)
+    position += bullets.nbytes
+    table = np.frombuffer(data, CHUNK_DTYPE, chunk_count, position)
+    position += table.nbytes
+
+    sections = memoryview(data)[position:]
+    if chunk_count and (table['offset'].astype(np.int64) + table['size']).max() > len(sections):
+        raise ValueError("Chunk section past the end of the world snapshot")
+    for offset, size in zip(table['offset'].tolist(), table['size'].tolist()):
+        check_chunk_section(sections[offset:offset + size])
+    return header, player_state, bullets, table, sections
+
+
+def decode_world(world, data: bytes):
+    """Replace the world with a snapshot from encode_world"""
+    header, player_state, bullets, table, sections = parse_world(data)
+    _, _, seed, game_over, offset_x, offset_y = header
+
+    world.reset(seed)
+    world.create_player()
+    player = world.player
+    (player.world_x, player.world_y, player.rotation, player.lives, player.kills, player.bullets_left,
+     player.shoot_delay, player.invulnerable_timer, player.night_vision_timer,
+     player.recharge_accumulator, player.recharge_timer) = player_state
+    player.save_previous_position()
+    world.offset_x = world.prev_offset_x = offset_x
+    world.offset_y = world.prev_offset_y = offset_y
+    world.render_alpha = 1.0
+
+    # Every chunk starts out encoded and evicted, update_chunks restores the ones around the player
+    for x, y, offset, size in table.tolist():
+        world.add_evicted_chunk(float(x), float(y), sections[offset:offset + size])
+    world.update_chunks()
+
+    # Bullet owners are entity ids, which are not kept, the player's are reassigned
+    for x, y, vx, vy, team, color in bullets.tolist():
+        owner_id = player._id if team == TEAM_PLAYER else 0
+        slot = world.projectiles.spawn(x, y, x + vx, y + vy, team, owner_id, tuple(color))
+        world.projectiles.vx[slot] = vx
+        world.projectiles.vy[slot] = vy
+
+    world.resume_game(game_over)
+
+
+def save_world(world, path: str = config.SNAPSHOT_FILE):
+    with open(path, 'wb') as file:
+        file.write(encode_world(world))
+
+
+def load_world(world, path: str = config.SNAPSHOT_FILE):
+    with open(path, 'rb') as file:
+        decode_world(world, file.read())
@@ -0,0 +1,91 @@
+class SpatialGrid:
+    """Collection of ScreenObjects bucketed by chunk cell.
+
+    Objects register themselves on append and are moved between cells by
+    ScreenObject whenever their world position crosses a cell boundary, so
+    neighbor queries only touch the 3x3 block of cells around a point.
+    Neighbor lists are cached until the grid changes, callers must not
+    modify them. The version counts changes, so other caches can tell
+    whether the grid still holds the same objects in the same cells.
+    """
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], dict] = {}
+        self._count = 0
+        self._neighbor_cache: dict[tuple[int, int], list] = {}
+        self.version = 0
+
+    def get_cell(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def append(self, obj):
+        cell = self.get_cell(obj.world_x, obj.world_y)
+        self.cells.setdefault(cell, {})[obj] = None
+        obj._grid = self
+        obj._grid_cell = cell
+        self._count += 1
+        self._neighbor_cache.clear()
+        self.version += 1
+
+    def remove(self, obj):
+        if obj._grid is not self:
+            raise ValueError("object is not in this grid")
+
+        cell_objects = self.cells[obj._grid_cell]
+        del cell_objects[obj]
+        if not cell_objects:
+            del self.cells[obj._grid_cell]
+
+        obj._grid = None
+        obj._grid_cell = None
+        self._count -= 1
+        self._neighbor_cache.clear()
+        self.version += 1
+
+    def move(self, obj):
+        """Re-bucket an object after its position changed"""
+        cell = self.get_cell(obj.world_x, obj.world_y)
+        if cell == obj._grid_cell:
+            return
+
+        cell_objects = self.cells[obj._grid_cell]
+        del cell_objects[obj]
+        if not cell_objects:
+            del self.cells[obj._grid_cell]
+
+        self.cells.setdefault(cell, {})[obj] = None
+        obj._grid_cell = cell
+        self._neighbor_cache.clear()
+        self.version += 1
+
+    def get_objects_in_cell(self, chunk_x: int, chunk_y: int) -> list:
+        return list(self.cells.get((chunk_x, chunk_y), ()))
+
+    def get_neighboring_objects(self, x: float, y: float) -> list:
+        """Get objects from the cell containing (x, y) and the 8 cells around it"""
+        chunk_x, chunk_y = self.get_cell(x, y)
+        nearby_objects = self._neighbor_cache.get((chunk_x, chunk_y))
+        if nearby_objects is not None:
+            return nearby_objects
+
+        nearby_objects = []
+
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                cell_objects = self.cells.get((chunk_x + dx, chunk_y + dy))
+                if cell_objects:
+                    nearby_objects.extend(cell_objects)
+
+        self._neighbor_cache[(chunk_x, chunk_y)] = nearby_objects
+        return nearby_objects
+
+    def __contains__(self, obj):
+        return getattr(obj, '_grid', None) is self
+
+    def __iter__(self):
+        for cell_objects in list(self.cells.values()):
+            yield from list(cell_objects)
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+import math
+import pygame, config
+from asset_registry import assets
+
+STONE_GRAY = (100, 100, 100)
+
+
+class StaticLayerCache:
+    """Floor and walls of every chunk baked into one surface per chunk.
+
+    A chunk is baked the first time it is on screen. Chunks are as large as
+    the screen, so drawing the static world takes at most four blits. Walls
+    spill into neighboring chunks, so a baked chunk also holds the parts of
+    its neighbors' walls that overlap it and is rebaked when that set of
+    walls changes. The cache is a bounded LRU and evicted chunks are dropped
+    from it by World.evict_chunk.
+    """
+
+    def __init__(self, world, max_chunks: int = config.CHUNK_LAYER_CACHE_SIZE):
+        self._world = world
+        self.max_chunks = max_chunks
+        # Chunk -> (surface, walls grid version, walls drawn on it)
+        self._layers: OrderedDict[tuple[int, int], tuple[pygame.Surface, int, tuple]] = OrderedDict()
+        self.bakes = 0
+
+    def clear(self):
+        self._layers.clear()
+
+    def discard(self, chunk_x: float, chunk_y: float):
+        self._layers.pop((int(chunk_x), int(chunk_y)), None)
+
+    def _get_walls(self, chunk_x: int, chunk_y: int) -> tuple:
+        """Walls overlapping a chunk, they are never longer than a chunk"""
+        size = self._world.CHUNK_SIZE
+        left, top = chunk_x * size, chunk_y * size
+        walls = self._world.walls.get_neighboring_objects(left + size / 2, top + size / 2)
+        return tuple(wall for wall in walls if wall.check_collision(left, top, size, size))
+
+    def _bake(self, chunk_x: int, chunk_y: int, walls: tuple) -> pygame.Surface:
+        size = self._world.CHUNK_SIZE
+        surface = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        # Floor tiles are aligned to the world origin, so chunks join seamlessly
+        floor_texture = assets.get_scaled(config.FLOOR_TEXTURE, (config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2), alpha=False)
+        left, top = chunk_x * size, chunk_y * size
+        if floor_texture:
+            tile_width, tile_height = floor_texture.get_size()
+            start_x = math.floor(left / tile_width) * tile_width - left
+            start_y = math.floor(top / tile_height) * tile_height - top
+            for y in range(start_y, size, tile_height):
+                for x in range(start_x, size, tile_width):
+                    surface.blit(floor_texture, (x, y))
+        else:
+            surface.fill(STONE_GRAY)
+
+        for wall in walls:
+            if wall.texture:
+                wall_left, wall_top, _, _ = wall.get_collision_rect()
+                surface.blit(wall.texture, (wall_left - left, wall_top - top))
+
+        self.bakes += 1
+        return surface
+
+    def get_layer(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        key = (chunk_x, chunk_y)
+        version = self._world.walls.version
+        entry = self._layers.get(key)
+        if entry is not None:
+            self._layers.move_to_end(key)
+            surface, baked_version, baked_walls = entry
+            if baked_version == version:
+                return surface
+
+            # Something was loaded or evicted, only rebake if it touches this chunk
+            walls = self._get_walls(chunk_x, chunk_y)
+            if walls == baked_walls:
+                self._layers[key] = (surface, version, baked_walls)
+                return surface
+        else:
+            walls = self._get_walls(chunk_x, chunk_y)
+
+        surface = self._bake(chunk_x, chunk_y, walls)
+        self._layers[key] = (surface, version, walls)
+        if len(self._layers) > self.max_chunks:
+            self._layers.popitem(last=False)
+        return surface
+
+    def draw(self, screen: pygame.Surface):
+        world = self._world
+        size = world.CHUNK_SIZE
+        offset_x, offset_y = world.get_render_offset()
+        # World position of the screen's top-left corner
+        left = -offset_x - config.SCREEN_WIDTH // 2
+        top = -offset_y - config.SCREEN_HEIGHT // 2
+
+        for chunk_y in range(math.floor(top / size), math.ceil((top + config.SCREEN_HEIGHT) / size)):
+            for chunk_x in range(math.floor(left / size), math.ceil((left + config.SCREEN_WIDTH) / size)):
+                screen.blit(self.get_layer(chunk_x, chunk_y), world.world_to_screen_coordinates(chunk_x * size, chunk_y * size))
@@ -0,0 +1,7 @@
+import os, sys
+
+# Tests run the simulation without a display, audio or loaded textures
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('TORCH_DUNGEON_HEADLESS', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import math, random
+import numpy as np
+import pytest
+
+from env import TorchDungeonEnv, CHANNEL_WALLS, CHANNEL_ENEMIES, CHANNEL_BULLETS, CHANNEL_BONUSES, CHANNELS
+
+
+def brute_force_grid(env: TorchDungeonEnv) -> np.ndarray:
+    """The observation grid by testing every cell against every object of the world"""
+    world = env.world
+    size = env.grid_size
+    cell_size = env.rasterizer.cell_size
+    column0 = math.floor(world.player.world_x / cell_size) - size // 2
+    row0 = math.floor(world.player.world_y / cell_size) - size // 2
+    grid = np.zeros((CHANNELS, size, size), dtype=np.uint8)
+
+    walls = [wall.get_collision_rect() for wall in world.walls]
+    points = [
+        (CHANNEL_ENEMIES, [(enemy.world_x, enemy.world_y) for enemy in world.enemies if not enemy.dead]),
+        (CHANNEL_BONUSES, [(bonus.world_x, bonus.world_y) for bonus in world.bonuses]),
+        (CHANNEL_BULLETS, [(bullet.world_x, bullet.world_y) for bullet in world.projectiles.get_bullets()]),
+    ]
+    for row in range(size):
+        for column in range(size):
+            left = (column0 + column) * cell_size
+            top = (row0 + row) * cell_size
+            right = left + cell_size
+            bottom = top + cell_size
+            # Walls mark every cell they overlap, the rest the cell their center is in
+            grid[CHANNEL_WALLS, row, column] = any(
+                wall_left < right and wall_left + width > left and wall_top < bottom and wall_top + height > top
+                for wall_left, wall_top, width, height in walls)
+            for channel, positions in points:
+                grid[channel, row, column] = any(left <= x < right and top <= y < bottom for x, y in positions)
+    return grid
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_grid_matches_brute_force(seed):
+    env = TorchDungeonEnv(seed)
+    observation, _ = env.reset()
+    rng = random.Random(seed)
+    for tick in range(300):
+        expected = brute_force_grid(env)
+        for channel in range(CHANNELS):
+            assert np.array_equal(observation['grid'][channel], expected[channel]), (tick, channel)
+
+        # Bonuses only drop from kills, scatter a few around the player as well
+        if tick % 25 == 0:
+            player = env.world.player
+            env.world.spawn_bonus(player.world_x + rng.uniform(-500, 500), player.world_y + rng.uniform(-500, 500))
+
+        action = (rng.choice([1, 1, 0, -1]), rng.choice([0, 1.5, -1.5]), rng.random() < 0.3)
+        observation, _, terminated, _, _ = env.step(action)
+        if terminated:
+            observation, _ = env.reset()
+
+
+def test_frame_skip_repeats_the_action():
+    skipping = TorchDungeonEnv(7, frame_skip=4)
+    stepping = TorchDungeonEnv(7)
+    skipping.reset()
+    stepping.reset()
+    action = (1, 1.5, True)
+    for _ in range(10):
+        observation, _, terminated, _, info = skipping.step(action)
+        for _ in range(4):
+            expected, _, _, _, _ = stepping.step(action)
+        assert not terminated
+        assert info['ticks'] == stepping.ticks
+        assert np.array_equal(observation['grid'], expected['grid'])
+        assert np.array_equal(observation['player'], expected['player'])
@@ -0,0 +1,60 @@
+import random
+
+import config
+from world import World
+from player import Player
+from enemy import Enemy
+from wall import Wall
+from bonus import Bonus
+from replay import InputFrame, InputRecorder, InputReplayer, Recording
+
+
+def record_session(path: str, seed: int, frames: int) -> InputRecorder:
+    """Play random input with restarts and a varying number of steps per frame"""
+    world = World(Player, Enemy, Wall, Bonus, seed=seed)
+    recorder = InputRecorder(world, path, 1 / config.SIMULATION_RATE)
+    world.dt = recorder.recording.dt
+    world.start_game()
+    recorder.start_game()
+    rng = random.Random(seed)
+    for frame in range(frames):
+        restart = world.is_game_over() or frame == frames // 2
+        if restart:
+            world.start_game()
+            recorder.start_game()
+        steps = rng.choice([0, 1, 1, 1, 2])
+        forward, rotation, shoot = rng.choice([1, 1, 0, -1]), rng.choice([0, 0, 1.5, -1.5]), rng.random() < 0.3
+        for _ in range(steps):
+            world.step(forward, rotation, shoot)
+            recorder.record_step()
+        recorder.record_frame(InputFrame(steps, forward, rotation, shoot, restart))
+    recorder.save()
+    return recorder
+
+
+def replay_session(path: str) -> InputReplayer:
+    replayer = InputReplayer(World(Player, Enemy, Wall, Bonus), Recording.load(path))
+    replayer.start_game()
+    while not replayer.is_finished():
+        replayer.play_frame()
+    return replayer
+
+
+def test_replay_stays_in_sync(tmp_path):
+    path = str(tmp_path / 'session.rec')
+    recorder = record_session(path, seed=4, frames=1200)
+    replayer = replay_session(path)
+    assert len(recorder.recording.hashes) > 0
+    assert replayer.steps == recorder.steps
+    assert replayer.mismatch is None
+
+
+def test_replay_reports_divergence(tmp_path):
+    path = str(tmp_path / 'session.rec')
+    record_session(path, seed=4, frames=1200)
+    recording = Recording.load(path)
+    # Turning the other way at the first moving frame sends the replay elsewhere
+    index = next(i for i, frame in enumerate(recording.frames) if frame.steps and frame.rotation)
+    recording.frames[index] = recording.frames[index]._replace(rotation=-recording.frames[index].rotation)
+    recording.save(path)
+    assert replay_session(path).mismatch is not None
@@ -0,0 +1,62 @@
+import asyncio
+
+from server import BotClient, GameServer
+
+
+class RecordingServer(GameServer):
+    """Keeps the state sent to every player at every tick"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent: dict[tuple[int, int], dict] = {}
+
+    def step(self):
+        super().step()
+        for client in self.clients:
+            if self.tick in client.history:
+                self.sent[client.player._id, self.tick] = client.history[self.tick]
+
+
+class CheckingBot(BotClient):
+    """Compares every decoded snapshot with what the server sent this bot's player"""
+
+    def __init__(self, server: RecordingServer, seed: int):
+        super().__init__(seed)
+        self.server = server
+        self.matched = 0
+        self.mismatched: list[int] = []
+
+    def receive_snapshot(self, message: bytes):
+        super().receive_snapshot(message)
+        if self.server.sent[self.player_id, self.tick] == self.state:
+            self.matched += 1
+        else:
+            self.mismatched.append(self.tick)
+
+
+async def play(clients: int, seconds: float) -> tuple[RecordingServer, list[CheckingBot]]:
+    server = RecordingServer(seed=5)
+    port = await server.serve('127.0.0.1', 0)
+    bots = [CheckingBot(server, seed) for seed in range(clients)]
+    bot_tasks = [asyncio.create_task(bot.run('127.0.0.1', port, seconds + 1)) for bot in bots]
+    while len(server.clients) < clients:
+        await asyncio.sleep(0.01)
+
+    async def end_game():
+        # Half way through everyone gets a new game, new player ids and full snapshots
+        await asyncio.sleep(seconds / 2)
+        server.world.end_game()
+
+    asyncio.create_task(end_game())
+    await server.run(seconds)
+    await server.close()
+    await asyncio.gather(*bot_tasks)
+    return server, bots
+
+
+def test_bots_decode_what_the_server_sent():
+    server, bots = asyncio.run(play(clients=8, seconds=4))
+    assert server.games == 2
+    for bot in bots:
+        assert bot.matched > 0
+        assert bot.mismatched == []
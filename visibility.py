@@ -0,0 +1,120 @@
+import math
+import numpy as np
+import config
+
+ANGLE_EPSILON = 1e-4  # Radians, rays just past a wall corner see behind it
+
+
+def compute_visibility_polygon(origin_x: float, origin_y: float, radius: float, rects: np.ndarray,
+                               ray_count: int = config.LIGHT_RAYS) -> tuple[np.ndarray, np.ndarray]:
+    """Area lit from a point, blocked by (left, top, width, height) rects.
+
+    Angular sweep: rays are cast towards every wall corner, slightly to
+    either side of it, and at ray_count even angles so the polygon follows
+    the circle of the given radius where nothing blocks it. Every ray stops
+    where it leaves the nearest rect it enters, so the walls themselves are
+    lit. Returns the sorted ray angles and the (K, 2) polygon vertices
+    relative to the origin.
+    """
+    angles = np.linspace(-math.pi, math.pi, ray_count, endpoint=False)
+
+    left = rects[:, 0] - origin_x
+    top = rects[:, 1] - origin_y
+    right = left + rects[:, 2]
+    bottom = top + rects[:, 3]
+    # Rects out of reach can't block anything, one around the origin would block everything
+    reachable = (left < radius) & (right > -radius) & (top < radius) & (bottom > -radius)
+    inside = (left <= 0) & (right >= 0) & (top <= 0) & (bottom >= 0)
+    keep = reachable & ~inside
+    left, top, right, bottom = left[keep], top[keep], right[keep], bottom[keep]
+
+    if len(left):
+        corner_x = np.concatenate((left, right, right, left))
+        corner_y = np.concatenate((top, top, bottom, bottom))
+        corner_angles = np.arctan2(corner_y, corner_x)
+        angles = np.concatenate((angles, corner_angles - ANGLE_EPSILON, corner_angles + ANGLE_EPSILON))
+        angles = np.sort((angles + math.pi) % (2 * math.pi) - math.pi)
+
+    direction_x = np.cos(angles)
+    direction_y = np.sin(angles)
+    distance = np.full(len(angles), float(radius))
+
+    if len(left):
+        # Slab test of every ray against every rect, NaNs from 0 * inf are ignored by fmin/fmax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse_x = (1 / direction_x)[:, None]
+            inverse_y = (1 / direction_y)[:, None]
+            tx1 = left[None, :] * inverse_x
+            tx2 = right[None, :] * inverse_x
+            ty1 = top[None, :] * inverse_y
+            ty2 = bottom[None, :] * inverse_y
+            t_near = np.fmax(np.fmin(tx1, tx2), np.fmin(ty1, ty2))
+            t_far = np.fmin(np.fmax(tx1, tx2), np.fmax(ty1, ty2))
+        hit = (t_near <= t_far) & (t_near >= 0)
+        nearest = np.where(hit, t_near, np.inf).argmin(axis=1)
+        rows = np.arange(len(angles))
+        # The ray lights the wall it hits up to its far side, the shadow starts behind it
+        blocked = hit[rows, nearest]
+        distance[blocked] = np.minimum(distance[blocked], t_far[rows, nearest][blocked])
+
+    points = np.column_stack((direction_x * distance, direction_y * distance))
+    return angles, points
+
+
+def polygon_contains(angles: np.ndarray, points: np.ndarray, x: float, y: float) -> bool:
+    """Whether a point relative to the origin is inside a polygon from compute_visibility_polygon"""
+    count = len(angles)
+    if count < 3:
+        return False
+
+    # The polygon is star-shaped around the origin, only the edge in the point's direction matters
+    index = int(np.searchsorted(angles, math.atan2(y, x))) % count
+    ax, ay = points[index - 1]
+    bx, by = points[index]
+    edge_x = bx - ax
+    edge_y = by - ay
+    point_side = edge_x * (y - ay) - edge_y * (x - ax)
+    origin_side = edge_x * -ay - edge_y * -ax
+    return point_side * origin_side >= 0
+
+
+class TorchVisibility:
+    """The player's torch polygon, recomputed only when the player or the walls change"""
+
+    def __init__(self, world, radius: float = config.TORCH_RADIUS + config.TORCH_FLICKER):
+        self._world = world
+        self.radius = radius
+        self.angles = np.zeros(0)
+        self.points = np.zeros((0, 2))
+        self.origin = (0.0, 0.0)
+        self.computations = 0
+        self._key = None
+
+    def clear(self):
+        self._key = None
+
+    def update(self) -> np.ndarray:
+        """Polygon vertices relative to the player, the same array while nothing changed"""
+        world = self._world
+        player = world.player
+        walls = world.walls
+        key = (player.world_x, player.world_y, walls, walls.version)
+        if key == self._key:
+            return self.points
+
+        nearby_walls = world.get_neighboring_objects(player.world_x, player.world_y, walls)
+        rects = np.array([wall.get_collision_rect() for wall in nearby_walls], dtype=float).reshape(-1, 4)
+        self.angles, self.points = compute_visibility_polygon(player.world_x, player.world_y, self.radius, rects)
+        self.origin = (player.world_x, player.world_y)
+        self.computations += 1
+        self._key = key
+        return self.points
+
+    def contains(self, world_x: float, world_y: float, radius: float | None = None) -> bool:
+        self.update()
+        x = world_x - self.origin[0]
+        y = world_y - self.origin[1]
+        radius = self.radius if radius is None else radius
+        if x * x + y * y > radius * radius:
+            return False
+        return polygon_contains(self.angles, self.points, x, y)
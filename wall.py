@@ -1,9 +1,13 @@
 from screen_object import ScreenObject
-import pygame, config
+import pygame, config, geometry
+from asset_registry import assets
+from hud import render_text
 
 from world import World
 
 class Wall(ScreenObject):
+    __slots__ = ('orientation', 'texture', '_rect')
+
     def __init__(self, world: World, world_x: float, world_y: float, width: float, height: float, orientation):
         super().__init__(world, world_x, world_y, width, height)
 
@@ -11,18 +15,25 @@ class Wall(ScreenObject):
         self.height = height
         self.orientation = orientation
 
-        try:
-            self.texture = pygame.image.load(config.WALL_TEXTURE)
-            self.texture = pygame.transform.scale(self.texture, (self.width, self.height) if self.orientation == 'horizontal' else (self.height, self.width))
-            if self.orientation == 'vertical':
-                self.texture = pygame.transform.rotate(self.texture, 90)
-        except pygame.error:
-            print("Could not load wall texture. Using default color.")
-            self.texture = None
+        self.texture = assets.get_wall_texture(self.width, self.height, self.orientation)
 
-    def get_collision_rect(self, dx: float = 0, dy: float = 0) -> tuple[float, float, float, float]:
+        # Walls never move, so their collision rect is computed once
         left, top = self.get_left_top_corner()
-        return left + dx, top + dy, self.width, self.height
+        self._rect = (left, top, self.width, self.height)
+
+    def get_collision_rect(self, dx: float = 0, dy: float = 0) -> tuple[float, float, float, float]:
+        left, top, width, height = self._rect
+        return left + dx, top + dy, width, height
+
+    def is_near(self, rect_world_x, rect_world_y, rect_width, rect_height) -> bool:
+        left, top, width, height = self._rect
+        return (rect_world_x < left + width + 2 and left < rect_world_x + rect_width + 2 and
+                rect_world_y < top + height + 2 and top < rect_world_y + rect_height + 2)
+
+    def check_collision(self, rect_world_x, rect_world_y, rect_width, rect_height):
+        if not self.is_near(rect_world_x, rect_world_y, rect_width, rect_height):
+            return False
+        return geometry.rects_collide(*self._rect, rect_world_x, rect_world_y, rect_width, rect_height)
 
     def draw(self, screen: pygame.Surface):
         (left, top) = self.get_left_top_corner()
@@ -39,10 +50,14 @@ class Wall(ScreenObject):
             screen.blit(self.texture, screen_rect)
 
         if config.DEBUG:
-            pygame.draw.rect(screen, (255, 0, 0), self.get_screen_collision_rect(), 1)
-            font = pygame.font.Font(None, 18)
-            text = font.render(f"{self._id}", True, (255, 255, 255))
-            screen.blit(text, (x + 2, y + 2))
+            self.draw_debug(screen)
+
+    def draw_debug(self, screen: pygame.Surface):
+        """Collision rect and id, walls themselves are drawn by the world's static layer"""
+        pygame.draw.rect(screen, (255, 0, 0), self.get_screen_collision_rect(), 1)
+        x, y = self._world.world_to_screen_coordinates(*self.get_left_top_corner())
+        text = render_text(f"{self._id}", 18, (255, 255, 255))
+        screen.blit(text, (x + 2, y + 2))
 
     def get_left_top_corner(self):
         correction_w = 0
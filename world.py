@@ -1,25 +1,115 @@
 from abc import ABC
-import pygame, math, random, config
+from typing import NamedTuple
+import pygame, math, random, hashlib, struct, config, geometry
+import numpy as np
+from spatial_grid import SpatialGrid
+from profiler import FrameProfiler
+from projectiles import ProjectileStore
+from visibility import TorchVisibility
+from static_layer import StaticLayerCache
+from pool import ObjectPool
+from audio import AudioService
+from chunk_loader import ChunkLoader
+from snapshot import decode_chunk_section
+
+CHUNK_ACTIVE = "active"
+CHUNK_DORMANT = "dormant"
+CHUNK_EVICTED = "evicted"
+
+class ChunkRecord(NamedTuple):
+    """Compact state of an evicted chunk, walls are regenerated from the seed"""
+    enemies: tuple[tuple[int, tuple], ...]  # (layout index, enemy state)
+    bonuses: tuple[tuple[float, float, str], ...]
+
+def get_chunk_rng(seed: int, chunk_x: float, chunk_y: float) -> random.Random:
+    """Random generator that only depends on the world seed and the chunk"""
+    digest = hashlib.blake2b(struct.pack('<qqq', seed, int(chunk_x), int(chunk_y)), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, 'little'))
+
+def generate_chunk_layout(seed: int, chunk_x: float, chunk_y: float, chunk_size: int) -> list[tuple[tuple, int, int]]:
+    """Generate the walls of a chunk and where their enemies start.
+
+    Returns (wall params, enemy wall side, enemy patrol offset) for every wall.
+    The result is the same for the same (seed, chunk_x, chunk_y) whatever
+    order chunks are visited in.
+    """
+    rng = get_chunk_rng(seed, chunk_x, chunk_y)
+
+    # Calculate chunk boundaries
+    chunk_start_x = chunk_x * chunk_size
+    chunk_start_y = chunk_y * chunk_size
+
+    # Generate 2-3 random walls in this chunk
+    num_walls = rng.randint(2, 3)
+    layout = []
+
+    for _ in range(num_walls):
+        # Randomly decide wall orientation
+        orientation = rng.choice(['vertical', 'horizontal'])
+
+        if orientation == 'vertical':
+            wall_x = rng.randint(math.floor(chunk_start_x + 100), math.floor(chunk_start_x + chunk_size - 100))
+            wall_y = rng.randint(math.floor(chunk_start_y + 100), math.floor(chunk_start_y + chunk_size - 200))
+            width = 30
+            height = rng.randint(200, 300)
+            patrol_length = height
+        else:
+            wall_x = rng.randint(math.floor(chunk_start_x + 100), math.floor(chunk_start_x + chunk_size - 200))
+            wall_y = rng.randint(math.floor(chunk_start_y + 100), math.floor(chunk_start_y + chunk_size - 100))
+            width = rng.randint(200, 300)
+            height = 30
+            patrol_length = width
+
+        wall_side = rng.choice([1, -1])
+        patrol_offset = rng.randint(0, patrol_length)
+        layout.append(((wall_x, wall_y, width, height, orientation), wall_side, patrol_offset))
+
+    return layout
 
 class World:
     _game_over = False
     CHUNK_SIZE = 800  # Size of each chunk
 
-    def __init__(self, Player, Enemy, Wall, Bonus):
+    def __init__(self, Player, Enemy, Wall, Bonus, seed: int | None = None):
         self.offset_x = 0
         self.offset_y = 0
+        self.prev_offset_x = 0
+        self.prev_offset_y = 0
+        self.render_alpha = 1.0  # Interpolation between the previous and current step
         self._Player = Player
         self._Enemy = Enemy
         self._Wall = Wall
         self._Bonus = Bonus
-        self.walls = []
-        self.enemies = []
-        self.bonuses = []
-        self.player = None
+        self.walls = SpatialGrid(self.CHUNK_SIZE)
+        self.enemies = SpatialGrid(self.CHUNK_SIZE)
+        self.bonuses = SpatialGrid(self.CHUNK_SIZE)
+        self.player = None  # The player the camera follows
+        self.players = []  # Every player in the world, self.player included
         self.dt = 0.0  # Time delta in seconds
+        self._requested_seed = seed
+        self.seed = self._pick_seed()
+        self.rng = random.Random(self.seed)  # Every gameplay roll, so a seed and the inputs replay a game
         self.generated_chunks = set()  # Keep track of generated chunks
-        self.torch_sound = pygame.mixer.Sound(config.TORCH_SOUND)
-        self.game_over_sound = pygame.mixer.Sound(config.GAME_OVER_SOUND)
+        self.chunk_states = {}  # Lifecycle state of every generated chunk
+        self.evicted_chunks = {}  # ChunkRecord of every evicted chunk
+        self.chunk_stats = {'loads': 0, 'restores': 0, 'evictions': 0}
+        self._current_chunk = None
+        self.chunk_loader = ChunkLoader(self, generate_chunk_layout)
+        self.audio = AudioService(self)
+        self.profiler = FrameProfiler()
+        self.projectiles = ProjectileStore(self)
+        self._visibility = {}  # Enemy -> nearest player it can see or None, for the current tick
+        self.torch_visibility = TorchVisibility(self)
+        self.static_layer = StaticLayerCache(self)
+        self.bonus_pool = ObjectPool(self._Bonus)
+        self._despawn_queue = {}  # Entity -> grid it was in when the despawn was requested
+
+    def _pick_seed(self) -> int:
+        if self._requested_seed is not None:
+            return self._requested_seed
+        if config.WORLD_SEED is not None:
+            return config.WORLD_SEED
+        return random.randrange(2 ** 32)
 
     def get_chunk_coords(self, x, y):
         # Convert world coordinates to chunk coordinates
@@ -29,99 +119,390 @@ class World:
 
     def get_neighboring_objects(self, x, y, objects):
         """Get objects from current and neighboring chunks"""
+        if isinstance(objects, SpatialGrid):
+            return objects.get_neighboring_objects(x, y)
+
         chunk_x, chunk_y = self.get_chunk_coords(x, y)
         nearby_objects = []
-        
-        # Check objects in current and adjacent chunks
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                chunk_bounds = (
-                    (chunk_x + dx) * self.CHUNK_SIZE,
-                    (chunk_y + dy) * self.CHUNK_SIZE,
-                    self.CHUNK_SIZE,
-                    self.CHUNK_SIZE
-                )
-                for obj in objects:
-                    if (obj.world_x >= chunk_bounds[0] and 
-                        obj.world_x < chunk_bounds[0] + chunk_bounds[2] and
-                        obj.world_y >= chunk_bounds[1] and 
-                        obj.world_y < chunk_bounds[1] + chunk_bounds[3]):
-                        nearby_objects.append(obj)
-        
+
+        # Plain lists are not indexed, fall back to scanning them
+        for obj in objects:
+            obj_chunk_x, obj_chunk_y = self.get_chunk_coords(obj.world_x, obj.world_y)
+            if abs(obj_chunk_x - chunk_x) <= 1 and abs(obj_chunk_y - chunk_y) <= 1:
+                nearby_objects.append(obj)
+
         return nearby_objects
 
-    def generate_walls_for_chunk(self, chunk_x: float, chunk_y: float):        
+    def get_chunk_layout(self, chunk_x: float, chunk_y: float):
+        return generate_chunk_layout(self.seed, chunk_x, chunk_y, self.CHUNK_SIZE)
+
+    def generate_walls_for_chunk(self, chunk_x: float, chunk_y: float, state: str = CHUNK_ACTIVE):
         # If chunk already generated, skip
         if (chunk_x, chunk_y) in self.generated_chunks:
             return
         
         # Mark chunk as generated
         self.generated_chunks.add((chunk_x, chunk_y))
-        
-        # Calculate chunk boundaries
-        chunk_start_x = chunk_x * self.CHUNK_SIZE
-        chunk_start_y = chunk_y * self.CHUNK_SIZE
-        
-        # Generate 2-3 random walls in this chunk
-        num_walls = random.randint(2, 3)
-        new_walls = []
-        
-        for _ in range(num_walls):
-            # Randomly decide wall orientation
-            orientation = random.choice(['vertical', 'horizontal'])
-            
-            if orientation == 'vertical':
-                wall_x = random.randint(math.floor(chunk_start_x + 100), math.floor(chunk_start_x + self.CHUNK_SIZE - 100))
-                wall_y = random.randint(math.floor(chunk_start_y + 100), math.floor(chunk_start_y + self.CHUNK_SIZE - 200))
-                width = 30
-                height = random.randint(200, 300)
-            else:
-                wall_x = random.randint(math.floor(chunk_start_x + 100), math.floor(chunk_start_x + self.CHUNK_SIZE - 200))
-                wall_y = random.randint(math.floor(chunk_start_y + 100), math.floor(chunk_start_y + self.CHUNK_SIZE - 100))
-                width = random.randint(200, 300)
-                height = 30
-            
-            new_walls.append((wall_x, wall_y, width, height, orientation))
-        
-        # Add new walls
-        for wall_params in new_walls:
+        self.chunk_states[(chunk_x, chunk_y)] = state
+        self.chunk_stats['loads'] += 1
+
+        self.attach_chunk_layout(self.chunk_loader.get_layout(chunk_x, chunk_y))
+
+    def attach_chunk_layout(self, layout: list, enemy_states: dict[int, tuple] | None = None):
+        """Create walls and their enemies from a chunk layout.
+
+        When enemy_states is given, only enemies listed in it are created and
+        their saved state is applied on top of the generated one.
+        """
+        for index, (wall_params, wall_side, patrol_offset) in enumerate(layout):
             wall = self._Wall(self, *wall_params)
             self.walls.append(wall)
+
+            if enemy_states is not None and index not in enemy_states:
+                continue
+
             # Create enemy for each wall
-            self.enemies.append(self._Enemy(self, wall))
-    
+            enemy = self._Enemy(self, wall, wall_side, patrol_offset)
+            if enemy_states is not None:
+                enemy.set_state(enemy_states[index])
+            self.enemies.append(enemy)
+
+    def spawn_bonus(self, world_x: float, world_y: float, bonus_type: str | None = None):
+        bonus = self.bonus_pool.acquire(self, world_x, world_y, bonus_type)
+        self.bonuses.append(bonus)
+        return bonus
+
+    def remove_bonus(self, bonus):
+        self.bonuses.remove(bonus)
+        self.bonus_pool.release(bonus)
+
+    def despawn(self, obj):
+        """Remove an entity from its grid at the end of the current tick.
+
+        Entities despawn themselves while the world iterates over them, the
+        queue keeps the containers unchanged until the tick is over.
+        """
+        self._despawn_queue.setdefault(obj, obj._grid)
+
+    def apply_despawns(self):
+        if not self._despawn_queue:
+            return
+
+        queue = self._despawn_queue
+        self._despawn_queue = {}
+        for obj, grid in queue.items():
+            # Evicted with its chunk in the meantime
+            if grid is None or obj._grid is not grid:
+                continue
+            if grid is self.bonuses:
+                self.remove_bonus(obj)
+            else:
+                grid.remove(obj)
+
+    def load_chunk(self, chunk_x: float, chunk_y: float, state: str = CHUNK_ACTIVE):
+        """Make a chunk resident, restoring it if it was evicted"""
+        if (chunk_x, chunk_y) in self.evicted_chunks:
+            self.restore_chunk(chunk_x, chunk_y, state)
+        else:
+            self.generate_walls_for_chunk(chunk_x, chunk_y, state)
+
+    def preload_chunk(self, chunk_x: float, chunk_y: float):
+        """Make a chunk resident before the player gets close enough to activate it"""
+        self.load_chunk(chunk_x, chunk_y, CHUNK_DORMANT)
+
+    def is_chunk_resident(self, chunk_x: float, chunk_y: float) -> bool:
+        return self.chunk_states.get((chunk_x, chunk_y), CHUNK_EVICTED) != CHUNK_EVICTED
+
+    def get_chunk_entities(self, chunk_x: float, chunk_y: float) -> tuple[list, dict, list, list]:
+        """Walls of a resident chunk, their layout indices, their enemies and the chunk's bonuses"""
+        walls = self.walls.get_objects_in_cell(chunk_x, chunk_y)
+        layout_indices = {wall_params[:2]: index for index, (wall_params, _, _) in enumerate(self.get_chunk_layout(chunk_x, chunk_y))}
+        wall_indices = {wall: layout_indices[(wall.world_x, wall.world_y)] for wall in walls}
+
+        # Enemies patrol along their wall, so they are always in a neighboring cell
+        center_x = (chunk_x + 0.5) * self.CHUNK_SIZE
+        center_y = (chunk_y + 0.5) * self.CHUNK_SIZE
+        enemies = [enemy for enemy in self.enemies.get_neighboring_objects(center_x, center_y)
+                   if enemy.wall in wall_indices]
+        bonuses = self.bonuses.get_objects_in_cell(chunk_x, chunk_y)
+        return walls, wall_indices, enemies, bonuses
+
+    def get_chunk_record(self, chunk_x: float, chunk_y: float) -> ChunkRecord:
+        """What evicting a resident chunk would keep of it"""
+        _, wall_indices, enemies, bonuses = self.get_chunk_entities(chunk_x, chunk_y)
+        return self._make_chunk_record(wall_indices, enemies, bonuses)
+
+    @staticmethod
+    def _make_chunk_record(wall_indices: dict, enemies: list, bonuses: list) -> ChunkRecord:
+        return ChunkRecord(
+            enemies=tuple((wall_indices[enemy.wall], enemy.get_state()) for enemy in enemies),
+            bonuses=tuple((bonus.world_x, bonus.world_y, bonus.type) for bonus in bonuses),
+        )
+
+    def evict_chunk(self, chunk_x: float, chunk_y: float):
+        """Unload a chunk's walls, their enemies and its bonuses into a ChunkRecord.
+
+        Walls are not stored since the seeded layout rebuilds them.
+        """
+        walls, wall_indices, enemies, bonuses = self.get_chunk_entities(chunk_x, chunk_y)
+        record = self._make_chunk_record(wall_indices, enemies, bonuses)
+
+        for enemy in enemies:
+            self.enemies.remove(enemy)
+        for wall in walls:
+            self.walls.remove(wall)
+        for bonus in bonuses:
+            self.remove_bonus(bonus)
+        self.static_layer.discard(chunk_x, chunk_y)
+
+        if config.CHUNK_KEEP_EVICTED_RECORDS:
+            self.evicted_chunks[(chunk_x, chunk_y)] = record
+            self.chunk_states[(chunk_x, chunk_y)] = CHUNK_EVICTED
+        else:
+            self.generated_chunks.discard((chunk_x, chunk_y))
+            del self.chunk_states[(chunk_x, chunk_y)]
+
+        self.chunk_stats['evictions'] += 1
+
+    def add_evicted_chunk(self, chunk_x: float, chunk_y: float, record: ChunkRecord | memoryview):
+        """Register a generated chunk that is not resident, a snapshot section is decoded on restore"""
+        self.generated_chunks.add((chunk_x, chunk_y))
+        self.evicted_chunks[(chunk_x, chunk_y)] = record
+        self.chunk_states[(chunk_x, chunk_y)] = CHUNK_EVICTED
+
+    def restore_chunk(self, chunk_x: float, chunk_y: float, state: str = CHUNK_ACTIVE):
+        record: ChunkRecord | memoryview = self.evicted_chunks.pop((chunk_x, chunk_y))
+        # Chunks of a loaded snapshot stay encoded until the player comes back to them
+        if not isinstance(record, ChunkRecord):
+            record = ChunkRecord(*decode_chunk_section(record))
+
+        self.attach_chunk_layout(self.chunk_loader.get_layout(chunk_x, chunk_y), dict(record.enemies))
+
+        for bonus_x, bonus_y, bonus_type in record.bonuses:
+            self.spawn_bonus(bonus_x, bonus_y, bonus_type)
+
+        self.chunk_states[(chunk_x, chunk_y)] = state
+        self.chunk_stats['loads'] += 1
+        self.chunk_stats['restores'] += 1
+
+    def update_chunk_states(self, player_chunks: list[tuple[float, float]]):
+        """Mark chunks active or dormant by distance to the nearest player and evict the far away ones"""
+        resident = []
+        for chunk, state in list(self.chunk_states.items()):
+            if state == CHUNK_EVICTED:
+                continue
+
+            distance = min(max(abs(chunk[0] - chunk_x), abs(chunk[1] - chunk_y)) for chunk_x, chunk_y in player_chunks)
+            if distance <= config.CHUNK_ACTIVE_RADIUS:
+                self.chunk_states[chunk] = CHUNK_ACTIVE
+            elif distance <= config.CHUNK_RESIDENT_RADIUS:
+                self.chunk_states[chunk] = CHUNK_DORMANT
+            else:
+                self.evict_chunk(*chunk)
+                continue
+
+            resident.append((distance, chunk))
+
+        # Enforce the hard cap, furthest chunks go first but never the active ones
+        if len(resident) > config.MAX_RESIDENT_CHUNKS:
+            resident.sort(reverse=True)
+            for distance, chunk in resident[:len(resident) - config.MAX_RESIDENT_CHUNKS]:
+                if distance <= config.CHUNK_ACTIVE_RADIUS:
+                    break
+                self.evict_chunk(*chunk)
+
+    def get_resident_chunk_count(self):
+        return sum(1 for state in self.chunk_states.values() if state != CHUNK_EVICTED)
+
+    def get_player_chunks(self) -> list[tuple[float, float]]:
+        """Chunks with at least one player in them, the camera player's first"""
+        players = [self.player, *self.players] if self.player else self.players
+        return list(dict.fromkeys(self.get_chunk_coords(player.world_x, player.world_y) for player in players))
+
     def update_chunks(self):
         if self.player:
             # Get current chunk coordinates
-            current_chunk_x, current_chunk_y = self.get_chunk_coords(
-                self.player.world_x, self.player.world_y
-            )
-            
-            # Generate walls for current and adjacent chunks
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    self.generate_walls_for_chunk(current_chunk_x + dx, current_chunk_y + dy)
+            player_chunks = self.get_player_chunks()
+            current_chunk_x, current_chunk_y = player_chunks[0]
+
+            # Load walls for current and adjacent chunks of every player
+            radius = config.CHUNK_ACTIVE_RADIUS
+            for chunk_x, chunk_y in player_chunks:
+                for dx in range(-radius, radius + 1):
+                    for dy in range(-radius, radius + 1):
+                        self.load_chunk(chunk_x + dx, chunk_y + dy)
+
+            # Chunks the player is heading to are generated in the background and attached ahead of time
+            self.chunk_loader.attach_ready()
+            self.chunk_loader.prefetch(current_chunk_x, current_chunk_y)
+
+            # Chunk states only change when a player crosses a chunk boundary
+            if player_chunks != self._current_chunk:
+                self._current_chunk = player_chunks
+                self.update_chunk_states(player_chunks)
+
+    def get_active_objects(self, objects) -> list:
+        """Objects updated every tick: the ones around the camera and around every other player"""
+        active = self.get_neighboring_objects(-self.offset_x, -self.offset_y, objects)
+        if len(self.players) <= 1:
+            return active
+
+        camera_chunk = self.get_chunk_coords(-self.offset_x, -self.offset_y)
+        active = dict.fromkeys(active)
+        for chunk_x, chunk_y in self.get_player_chunks():
+            if (chunk_x, chunk_y) != camera_chunk:
+                active.update(dict.fromkeys(self.get_neighboring_objects(
+                    (chunk_x + 0.5) * self.CHUNK_SIZE, (chunk_y + 0.5) * self.CHUNK_SIZE, objects)))
+        return list(active)
     
+    def save_previous_positions(self):
+        """Remember where moving objects were before a step, for interpolated rendering"""
+        self.prev_offset_x = self.offset_x
+        self.prev_offset_y = self.offset_y
+
+        if not self.player:
+            return
+
+        for player in self.players:
+            player.save_previous_position()
+        self.projectiles.save_previous_positions()
+
+        for enemy in self.get_active_objects(self.enemies):
+            enemy.save_previous_position()
+
+    def step(self, forward: float = 0, rotation: float = 0, shoot: bool = False):
+        """Advance the simulation by one fixed step of self.dt seconds"""
+        self.step_players({self.player: (forward, rotation, shoot)} if self.player else {})
+
+    def step_players(self, inputs: dict):
+        """Advance one step with the (forward, rotation, shoot) input of every player in inputs"""
+        self.save_previous_positions()
+
+        if not self.is_game_over():
+            for player, (forward, rotation, shoot) in inputs.items():
+                # Players out of lives wait for the others to finish the game
+                if player.lives <= 0:
+                    continue
+                player.move(forward)
+                player.rotate(rotation)
+                if shoot:
+                    player.shoot()
+
+        self.update()
+
     def update(self):
         if not self.player:
             return
         
-        self.player.update()
-        
+        profiler = self.profiler
+
+        started = profiler.start()
+        self.update_visibility()
+        profiler.stop('visibility', started)
+
+        started = profiler.start()
+        for player in self.players:
+            player.update()
+        profiler.stop('player_update', started)
+
+        started = profiler.start()
         self.update_chunks()
+        profiler.stop('chunks', started)
 
         # Update enemies
-        nearby_enemies = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.enemies)
+        started = profiler.start()
+        nearby_enemies = self.get_active_objects(self.enemies)
         for enemy in nearby_enemies:
             enemy.update()
-            
+        profiler.stop('enemy_update', started)
+
+        # Move every bullet in the world and resolve their hits
+        started = profiler.start()
+        self.projectiles.update()
+        profiler.stop('projectile_update', started)
+
         # Update bonuses
-        nearby_bonuses = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.bonuses)
+        started = profiler.start()
+        nearby_bonuses = self.get_active_objects(self.bonuses)
         for bonus in nearby_bonuses:
             bonus.update()
+        profiler.stop('bonus_update', started)
+
+        self.apply_despawns()
                 
+    def update_visibility(self):
+        """Compute line of sight from the active enemies to every player, in one batch per player"""
+        self._visibility = {}
+        if not self.player or self.is_game_over():
+            return
+
+        distances = {}  # Enemy -> squared distance to the player it aims at
+        for player in self.players:
+            if player.lives <= 0:
+                continue
+
+            player_x, player_y = player.world_x, player.world_y
+            enemies = [enemy for enemy in self.get_neighboring_objects(player_x, player_y, self.enemies) if not enemy.dead]
+            if not enemies:
+                continue
+
+            enemy_x = np.array([enemy.world_x for enemy in enemies])
+            enemy_y = np.array([enemy.world_y for enemy in enemies])
+            distance = (enemy_x - player_x) ** 2 + (enemy_y - player_y) ** 2
+            visible = distance <= config.TORCH_RADIUS ** 2
+
+            # Sight lines are at most a torch radius long, so walls around the player are enough
+            walls = self.get_neighboring_objects(player_x, player_y, self.walls)
+            if walls and visible.any():
+                rects = np.array([wall.get_collision_rect() for wall in walls], dtype=float)
+                blocked = geometry.segments_intersect_rects(enemy_x[visible], enemy_y[visible], player_x, player_y, rects).any(axis=1)
+                visible[visible] = ~blocked
+
+            # Enemies that see several players aim at the nearest one
+            for enemy, enemy_visible, enemy_distance in zip(enemies, visible.tolist(), distance.tolist()):
+                if enemy_visible and enemy_distance < distances.get(enemy, math.inf):
+                    self._visibility[enemy] = player
+                    distances[enemy] = enemy_distance
+                else:
+                    self._visibility.setdefault(enemy, None)
+
+    def get_enemy_target(self, enemy):
+        """The nearest player the enemy can see, None if it sees none"""
+        if enemy in self._visibility:
+            return self._visibility[enemy]
+
+        # Enemies outside the batch are computed on demand and cached for the tick
+        visible = [player for player in self.players if player.lives > 0 and enemy.compute_can_see_player(player)]
+        target = self._visibility[enemy] = min(
+            visible, key=lambda player: (player.world_x - enemy.world_x) ** 2 + (player.world_y - enemy.world_y) ** 2,
+            default=None)
+        return target
+
+    def can_enemy_see_player(self, enemy) -> bool:
+        return self.get_enemy_target(enemy) is not None
+
+    def get_player_by_id(self, player_id: int):
+        for player in self.players:
+            if player._id == player_id:
+                return player
+        return None
+
+    def is_lit_for_player(self, world_x: float, world_y: float, radius: float = config.TORCH_RADIUS) -> bool:
+        """Whether the player can see a point, through night vision or in the torch light"""
+        player = self.player
+        if not player or self.is_game_over():
+            return False
+        if player.night_vision_timer > 0:
+            return True
+        return self.torch_visibility.contains(world_x, world_y, radius)
+
+    def get_render_offset(self) -> tuple[float, float]:
+        return (self.prev_offset_x + (self.offset_x - self.prev_offset_x) * self.render_alpha,
+                self.prev_offset_y + (self.offset_y - self.prev_offset_y) * self.render_alpha)
+
     def world_to_screen_coordinates(self, x: float, y: float):
-        return x + self.offset_x + config.SCREEN_WIDTH // 2, y + self.offset_y + config.SCREEN_HEIGHT // 2
+        offset_x, offset_y = self.get_render_offset()
+        return x + offset_x + config.SCREEN_WIDTH // 2, y + offset_y + config.SCREEN_HEIGHT // 2
         
     def offset(self, dx, dy):
         self.offset_x -= dx
@@ -129,52 +510,128 @@ class World:
 
     def create_player(self):
         self.player = self._Player(self, 0, 0)
+        self.players = [self.player]
+
+    def add_player(self, world_x: float = 0, world_y: float = 0):
+        """Join another player to the game, the first one is followed by the camera"""
+        player = self._Player(self, world_x, world_y)
+        self.players.append(player)
+        if self.player is None:
+            self.player = player
+        return player
+
+    def remove_player(self, player):
+        self.players.remove(player)
+        if player is self.player:
+            self.player = self.players[0] if self.players else None
+            # The camera jumps to the new player rather than following on from where the old one left
+            if self.player:
+                self.offset_x = self.prev_offset_x = -self.player.world_x
+                self.offset_y = self.prev_offset_y = -self.player.world_y
 
     def create_walls(self, walls: list[tuple[int, int, int, int, str]]):
-        self.walls = []
+        self.walls = SpatialGrid(self.CHUNK_SIZE)
         for wall in walls:
             self.walls.append(self._Wall(self, *wall))
 
     def create_enemies(self):
-        self.enemies = []
+        self.enemies = SpatialGrid(self.CHUNK_SIZE)
         for wall in self.walls:
             self.enemies.append(self._Enemy(self, wall))
 
     def end_game(self):
-        self.torch_sound.stop()
+        self.audio.stop_loop()
         self._game_over = True
-        self.game_over_sound.play()
+        self.audio.play(config.GAME_OVER_SOUND)
     
-    def start_game(self):
-        self.walls = []
-        self.enemies = []
-        self.bonuses = []
+    def reset(self, seed: int | None = None):
+        """Drop every chunk, entity and bullet of the current world"""
+        # Without a fixed seed every restart explores a new world
+        self.seed = seed if seed is not None else self._pick_seed()
+        self.rng = random.Random(self.seed)
+        self.walls = SpatialGrid(self.CHUNK_SIZE)
+        self.enemies = SpatialGrid(self.CHUNK_SIZE)
+        self.bonuses = SpatialGrid(self.CHUNK_SIZE)
+        self.projectiles.clear()
+        self._visibility = {}
+        self.torch_visibility.clear()
+        self.static_layer.clear()
+        self._despawn_queue = {}
+        self.chunk_loader.clear()
         self.generated_chunks = set()
+        self.chunk_states = {}
+        self.evicted_chunks = {}
+        self.chunk_stats = {'loads': 0, 'restores': 0, 'evictions': 0}
+        self._current_chunk = None
+
+    def start_game(self, seed: int | None = None, players: int = 1):
+        self.reset(seed)
         self.create_player()
+        for _ in range(players - 1):
+            self.add_player()
         self.update_chunks()  # Generate initial chunks
         self.offset_x = self.offset_y = 0
-        self.torch_sound.play(-1)
-        self._game_over = False
+        self.prev_offset_x = self.prev_offset_y = 0
+        self.render_alpha = 1.0
+        self.resume_game()
+
+    def resume_game(self, game_over: bool = False):
+        """Start playing a world set up by start_game or loaded from a snapshot"""
+        self._game_over = game_over
+        if not game_over:
+            self.audio.play_loop(config.TORCH_SOUND)
     
     def is_game_over(self):
         return self._game_over
 
-    def draw(self, screen: pygame.Surface):
-        # Draw walls
-        nearby_walls = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.walls)
-        for wall in nearby_walls:
-            wall.draw(screen)
+    def get_clip_world_rect(self, screen: pygame.Surface, margin: float) -> tuple[float, float, float, float]:
+        """World (left, top, right, bottom) of the screen's clip rect grown by margin on every side"""
+        clip = screen.get_clip()
+        offset_x, offset_y = self.get_render_offset()
+        left = clip.left - offset_x - config.SCREEN_WIDTH // 2
+        top = clip.top - offset_y - config.SCREEN_HEIGHT // 2
+        return left - margin, top - margin, left + clip.width + margin, top + clip.height + margin
+
+    def draw(self, screen: pygame.Surface, redraw: bool = False):
+        """Draw the world, redraw repeats this frame's draw into another clip rect"""
+        profiler = self.profiler
+
+        # Draw the floor and the walls, baked per chunk
+        started = profiler.start()
+        self.static_layer.draw(screen)
+        profiler.stop('floor', started)
+
+        if config.DEBUG:
+            started = profiler.start()
+            nearby_walls = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.walls)
+            for wall in nearby_walls:
+                wall.draw_debug(screen)
+            profiler.stop('wall_draw', started)
+
+        # Sprites too far from the clip rect would draw nothing, with dirty rects most of them are
+        clip_left, clip_top, clip_right, clip_bottom = self.get_clip_world_rect(screen, config.ENEMY_TEXTURE_SIZE)
 
         # Draw enemies
+        started = profiler.start()
         nearby_enemies = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.enemies)
         for enemy in nearby_enemies:
-            enemy.draw(screen)
-            
+            if clip_left < enemy.world_x < clip_right and clip_top < enemy.world_y < clip_bottom:
+                enemy.draw(screen)
+        profiler.stop('enemy_draw', started)
+
         # Draw bonuses
+        started = profiler.start()
         nearby_bonuses = self.get_neighboring_objects(-self.offset_x, -self.offset_y, self.bonuses)
         for bonus in nearby_bonuses:
-            bonus.draw(screen)
+            if clip_left < bonus.world_x < clip_right and clip_top < bonus.world_y < clip_bottom:
+                bonus.draw(screen)
+        profiler.stop('bonus_draw', started)
+
+        # Draw bullets
+        started = profiler.start()
+        self.projectiles.draw(screen)
+        profiler.stop('projectile_draw', started)
 
         # Draw player
         if self.player:
-            self.player.draw(screen)
\ No newline at end of file
+            self.player.draw(screen, redraw)
\ No newline at end of file